@@ -1,7 +1,12 @@
 # backend/app.py
 import os
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import secrets
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import FastAPI, HTTPException, Query, Request, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 import chromadb
 from chromadb.config import Settings
 import google.generativeai as genai
@@ -11,20 +16,30 @@ from chromadb.errors import NotFoundError
 # Import constants
 from constants import (
     COLLECTION_NAME,
+    DEFAULT_EMBEDDING_PROFILE,
     API_VERSION,
     API_TITLE,
     API_DESCRIPTION
 )
 
+# Import response helpers
+from utils.compression import CompressionMiddleware
+from utils.responses import ORJSONResponse
+from utils.filters import parse_filters
+from utils.etags import CONTENT_VERSIONS, not_modified, with_etag
+from utils.tracing import SlowRequestMiddleware, TracedCollection, TracedRoute, recent_slow_requests
+
 # Import Gemini utilities
 from utils.gemini import (
-    create_gemini_embedding_function
+    create_gemini_embedding_function,
+    get_breaker_states
 )
 
 # Import Pydantic models
 from models.models import (
     StoreRequest,
-    ContextRequest
+    ContextRequest,
+    RetentionPolicyRequest
 )
 
 # Import business logic modules
@@ -35,6 +50,21 @@ from src.context import (
     clear_user_data as clear_user_data_func,
     delete_context_by_id as delete_context_by_id_func
 )
+from src.search import search_conversations
+from src.backfill import EmbeddingBackfillJob
+from src.hot_index import HotVectorIndex
+from src.migrations import MigrationJob
+from src.profiling import SamplingProfiler, AllocationTracker
+from src.topics import TopicClusteringJob, get_user_topics
+from src.retention import (
+    CompactionJob,
+    load_retention_policies,
+    update_retention_policy
+)
+from src.snapshot import (
+    export_snapshot,
+    import_snapshot
+)
 from src.generate_context import (
     generate_context_from_all_conversations,
     generate_context_from_specific_conversation
@@ -50,6 +80,20 @@ if not GEMINI_API_KEY:
 
 genai.configure(api_key=GEMINI_API_KEY)
 
+# Embedding storage profile (see EMBEDDING_PROFILES in constants.py)
+EMBEDDING_PROFILE = os.environ.get("EMBEDDING_PROFILE", DEFAULT_EMBEDDING_PROFILE)
+
+# Debug surface: profiling/allocation endpoints need both a flag and a token;
+# the slow-request log is enabled by setting a threshold in milliseconds
+DEBUG_ENDPOINTS = os.environ.get("DEBUG_ENDPOINTS", "").lower() in ("1", "true", "yes")
+DEBUG_TOKEN = os.environ.get("DEBUG_TOKEN")
+if DEBUG_ENDPOINTS and not DEBUG_TOKEN:
+    raise RuntimeError("Set DEBUG_TOKEN in environment or .env file to enable DEBUG_ENDPOINTS")
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS") or 0)
+
+# Admin token for snapshot imports and full-collection exports (both refused while unset)
+SNAPSHOT_TOKEN = os.environ.get("SNAPSHOT_TOKEN")
+
 # Chroma client - local persistent folder
 client = chromadb.PersistentClient(path="./chroma_data")
 
@@ -60,11 +104,48 @@ except NotFoundError:
     # Collection doesn't exist, create it
     collection = client.create_collection(name=COLLECTION_NAME)
 
+if SLOW_REQUEST_MS > 0:
+    # Time every Chroma call so slow traces can say where the time went
+    collection = TracedCollection(collection)
+
 # Create Gemini embedding function instance
-gemini_ef = create_gemini_embedding_function()
+gemini_ef = create_gemini_embedding_function(EMBEDDING_PROFILE)
+
+# Vectors stored under another profile can't be queried with this one's size
+stored = collection.get(limit=1, include=["embeddings"])["embeddings"]
+if stored is not None and len(stored) and len(stored[0]) != gemini_ef.dimensions:
+    raise RuntimeError(
+        f"chroma_data holds {len(stored[0])}-dimensional embeddings but EMBEDDING_PROFILE "
+        f"'{EMBEDDING_PROFILE}' uses {gemini_ef.dimensions}; restore the previous profile "
+        "or start from a fresh chroma_data directory"
+    )
+
+
+# In-memory hot tier of per-user embedding matrices
+hot_index = HotVectorIndex(collection, gemini_ef.dimensions, gemini_ef.profile["dtype"])
 
+# Background jobs: startup migrations, retention/compaction and embedding backfill
+migration_job = MigrationJob(collection, hot_index)
+compaction_job = CompactionJob(collection, gemini_ef, hot_index)
+backfill_job = EmbeddingBackfillJob(collection, gemini_ef, hot_index)
+topic_job = TopicClusteringJob(collection)
 
-app = FastAPI(title=API_TITLE, version=API_VERSION)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Backfill numeric timestamps and topic labels for rows stored by older versions
+    migration_job.start()
+    compaction_job.start()
+    backfill_job.start()
+    topic_job.start()
+    yield
+    await migration_job.stop()
+    await topic_job.stop()
+    await backfill_job.stop()
+    await compaction_job.stop()
+
+
+app = FastAPI(title=API_TITLE, version=API_VERSION, lifespan=lifespan)
 
 # Add CORS middleware to allow requests from anywhere
 app.add_middleware(
@@ -73,17 +154,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["ETag"],  # Let the extension read ETags for conditional requests
 )
 
+# Compress large responses (brotli when available, otherwise gzip)
+app.add_middleware(CompressionMiddleware)
+
+if SLOW_REQUEST_MS > 0:
+    # Outermost, so the trace covers validation, handlers and compression
+    app.add_middleware(SlowRequestMiddleware, threshold_ms=SLOW_REQUEST_MS)
+    # Routes declared below time their request parsing/validation as a span
+    app.router.route_class = TracedRoute
+
 
 @app.post("/store")
 async def store(req: StoreRequest):
     """Store conversation data with auto-generated title"""
-    return await store_conversation(req, collection, gemini_ef)
+    return await store_conversation(req, collection, gemini_ef, hot_index)
 
-@app.get("/get_all")
-async def get_all(user_id: str):
-    return await get_all_conversations(user_id, collection)
+@app.get("/get_all", response_class=ORJSONResponse)
+async def get_all(
+    request: Request,
+    user_id: str,
+    layout: str = Query("items", description="Response layout: 'items' or 'columns'"),
+    since: str | None = Query(None, description="Only conversations at/after this time (epoch seconds or ISO 8601)"),
+    until: str | None = Query(None, description="Only conversations at/before this time (epoch seconds or ISO 8601)"),
+    source: str | None = Query(None, description="Only conversations from this source")
+):
+    """Retrieve all conversations for a user (304 if the client's ETag is current)"""
+    filters = parse_filters(since, until, source)
+    etag = CONTENT_VERSIONS.etag(user_id, "get_all", layout, sorted(filters.items()))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    # Return the response directly so FastAPI skips jsonable_encoder
+    return with_etag(ORJSONResponse(await get_all_conversations(user_id, collection, layout, filters)), etag)
+
+
+@app.get("/search", response_class=ORJSONResponse)
+async def search(
+    user_id: str = Query(..., description="User ID"),
+    query: str = Query(..., description="Search query"),
+    limit: int = Query(10, description="Maximum number of results"),
+    rerank: bool | None = Query(None, description="Re-rank candidates exactly (defaults to embedding profile)"),
+    since: str | None = Query(None, description="Only conversations at/after this time (epoch seconds or ISO 8601)"),
+    until: str | None = Query(None, description="Only conversations at/before this time (epoch seconds or ISO 8601)"),
+    source: str | None = Query(None, description="Only conversations from this source")
+):
+    """Semantic search through a user's stored conversations"""
+    filters = parse_filters(since, until, source)
+    return ORJSONResponse(
+        await search_conversations(user_id, query, limit, collection, gemini_ef, rerank, hot_index, filters)
+    )
 
 
 @app.get("/health")
@@ -97,6 +219,12 @@ async def health_check():
         return {
             "status": "healthy",
             "collection_exists": collection_exists,
+            "embedding_profile": gemini_ef.profile,
+            "gemini_breakers": get_breaker_states(),
+            "embedding_backfill": backfill_job.status(),
+            "hot_index": hot_index.status(),
+            "topic_clustering": topic_job.stats,
+            "migrations": migration_job.stats,
             "api_version": API_VERSION
         }
     except Exception as e:
@@ -105,12 +233,12 @@ async def health_check():
 @app.delete("/clear")
 async def clear_all_data():
     """Clear all data from ChromaDB collection"""
-    return await clear_all_data_func(collection)
+    return await clear_all_data_func(collection, hot_index)
 
 @app.delete("/clear/{user_id}")
 async def clear_user_data(user_id: str):
     """Clear all data for a specific user"""
-    return await clear_user_data_func(user_id, collection)
+    return await clear_user_data_func(user_id, collection, hot_index)
 
 @app.delete("/delete_context/{context_id}")
 async def delete_context(
@@ -118,42 +246,195 @@ async def delete_context(
     user_id: str = Query(..., description="User ID to verify ownership")
 ):
     """Delete a specific context by context_id, verifying it belongs to user_id"""
-    return await delete_context_by_id_func(context_id, user_id, collection)
+    return await delete_context_by_id_func(context_id, user_id, collection, hot_index)
 
 
-@app.post("/generate_context")
-async def generate_context(request: ContextRequest):
+def _context_response(result: dict, etag: str) -> ORJSONResponse:
+    """Cacheable context response; extractive fallbacks get no ETag so clients retry Gemini"""
+    response = ORJSONResponse(result)
+    if "note" in result:
+        return response
+    return with_etag(response, etag)
+
+@app.post("/generate_context", response_class=ORJSONResponse)
+async def generate_context(request: ContextRequest, http_request: Request):
     """Generate intelligent context summary using Gemini from stored conversations"""
-    return await generate_context_from_all_conversations(request, collection)
+    etag = CONTENT_VERSIONS.etag(
+        request.user_id, "generate_context", request.max_length, request.prefilter, request.topics,
+        request.since, request.until, request.source
+    )
+    cached = not_modified(http_request, etag)
+    if cached is not None:
+        return cached
+    return _context_response(await generate_context_from_all_conversations(request, collection), etag)
 
-@app.get("/generate_context/{context_id}")
+@app.get("/generate_context/{context_id}", response_class=ORJSONResponse)
 async def generate_context_by_id(
+    request: Request,
     context_id: str, 
     user_id: str = Query(..., description="User ID"), 
     max_length: int = Query(2000, description="Maximum context length")
 ):
     """Generate intelligent context summary for a specific stored conversation"""
-    return await generate_context_from_specific_conversation(context_id, user_id, max_length, collection)
+    etag = CONTENT_VERSIONS.etag(user_id, "generate_context", context_id.strip(), max_length)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return _context_response(
+        await generate_context_from_specific_conversation(context_id, user_id, max_length, collection),
+        etag
+    )
+
+@app.get("/topics", response_class=ORJSONResponse)
+async def topics(request: Request, user_id: str = Query(..., description="User ID")):
+    """List a user's conversation topics with counts and representative conversations"""
+    etag = CONTENT_VERSIONS.etag(user_id, "topics")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return with_etag(ORJSONResponse(await get_user_topics(user_id, collection)), etag)
+
+def require_snapshot_token(x_snapshot_token: str | None):
+    """Reject admin snapshot requests without the configured token"""
+    if not SNAPSHOT_TOKEN:
+        raise HTTPException(status_code=403, detail="Set SNAPSHOT_TOKEN to enable snapshot imports and full exports")
+    if x_snapshot_token is None or not secrets.compare_digest(x_snapshot_token.encode(), SNAPSHOT_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid snapshot token")
+
+@app.get("/snapshot/export")
+async def snapshot_export(
+    user_id: str | None = Query(None, description="Export only this user's data (omit for full collection)"),
+    x_snapshot_token: str | None = Header(None, description="Value of SNAPSHOT_TOKEN, required without user_id")
+):
+    """Stream a Parquet snapshot of ids, documents, metadata and embeddings"""
+    if not (user_id and user_id.strip()):
+        require_snapshot_token(x_snapshot_token)
+    chunks = export_snapshot(collection, user_id, gemini_ef.profile["dtype"])
+    filename = f"snapshot-{user_id.strip()}.parquet" if user_id else "snapshot.parquet"
+    return StreamingResponse(
+        chunks,
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.post("/snapshot/import")
+async def snapshot_import(
+    request: Request,
+    user_id: str | None = Query(None, description="Import only this user's rows (omit for all rows)"),
+    x_snapshot_token: str | None = Header(None, description="Value of SNAPSHOT_TOKEN")
+):
+    """Bulk import a Parquet snapshot without re-embedding"""
+    require_snapshot_token(x_snapshot_token)
+    return await import_snapshot(request.stream(), collection, user_id, hot_index)
+
+@app.get("/retention/policies")
+async def get_retention_policies():
+    """Get the configured retention policies"""
+    return load_retention_policies()
+
+@app.put("/retention/policies")
+async def set_retention_policy(request: RetentionPolicyRequest):
+    """Set the retention policy for a user, a source, or the global default"""
+    policy = request.model_dump(include={"max_age_days", "max_count", "max_bytes"}, exclude_unset=True)
+    return update_retention_policy(policy, request.user_id, request.source)
+
+@app.post("/retention/run")
+async def run_retention(user_id: str | None = Query(None, description="Compact only this user")):
+    """Run a compaction pass now and report how much it reclaimed"""
+    return {"ok": True, "reclaimed": await compaction_job.run_once(user_id), "totals": compaction_job.stats}
+
+@app.get("/retention/status")
+async def retention_status():
+    """Report cumulative compaction statistics"""
+    return compaction_job.stats
+
+if DEBUG_ENDPOINTS:
+    profiler = SamplingProfiler()
+    allocation_tracker = AllocationTracker()
+
+    def require_debug_token(x_debug_token: str = Header(..., description="Value of DEBUG_TOKEN")):
+        """Reject debug requests without the configured token"""
+        if not secrets.compare_digest(x_debug_token.encode(), DEBUG_TOKEN.encode()):
+            raise HTTPException(status_code=403, detail="Invalid debug token")
+
+    @app.get("/debug/profile", dependencies=[Depends(require_debug_token)])
+    async def debug_profile(seconds: float = Query(10, description="Profile duration in seconds")):
+        """Sample the worker's CPU stacks and download them as folded stacks for a flamegraph"""
+        result = await asyncio.to_thread(profiler.profile, seconds)
+        filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+        return PlainTextResponse(
+            result["folded"],
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Profile-Samples": str(result["samples"]),
+                "X-Profile-Duration": str(result["duration_seconds"])
+            }
+        )
+
+    @app.post("/debug/memory/start", dependencies=[Depends(require_debug_token)])
+    async def debug_memory_start(frames: int = Query(1, description="Traceback depth per allocation")):
+        """Start tracemalloc and take the baseline snapshot"""
+        return allocation_tracker.start(frames)
+
+    @app.post("/debug/memory/snapshot", dependencies=[Depends(require_debug_token)])
+    async def debug_memory_snapshot():
+        """Replace the baseline with a snapshot of the current heap"""
+        return await asyncio.to_thread(allocation_tracker.snapshot)
+
+    @app.get("/debug/memory/diff", dependencies=[Depends(require_debug_token)])
+    async def debug_memory_diff(
+        limit: int = Query(20, description="Maximum number of entries"),
+        group_by: str = Query("lineno", description="Group by 'lineno', 'filename' or 'traceback'")
+    ):
+        """Largest allocation changes since the baseline snapshot"""
+        return await asyncio.to_thread(allocation_tracker.diff, limit, group_by)
+
+    @app.post("/debug/memory/stop", dependencies=[Depends(require_debug_token)])
+    async def debug_memory_stop():
+        """Stop tracemalloc"""
+        return allocation_tracker.stop()
+
+    @app.get("/debug/slow_requests", dependencies=[Depends(require_debug_token)])
+    async def debug_slow_requests(limit: int = Query(50, description="Maximum number of traces")):
+        """Most recent requests slower than SLOW_REQUEST_MS, with a per-span breakdown"""
+        return {"threshold_ms": SLOW_REQUEST_MS or None, "traces": recent_slow_requests(limit)}
 
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
+    info = {
         "name": API_TITLE,
         "version": API_VERSION,
         "description": API_DESCRIPTION,
         "endpoints": {
             "POST /store": "Store conversation data with auto-generated title",
-            "GET /get_all": "Retrieve all conversations for a user",
-            "POST /search": "Search for relevant context",
+            "GET /get_all": "Retrieve all conversations for a user (layout=items|columns, optional since/until/source)",
+            "GET /search": "Semantic search through stored conversations (optional since/until/source)",
             "POST /generate_context": "Generate intelligent context summary from all conversations",
             "GET /generate_context/{context_id}": "Generate intelligent context summary for specific conversation",
             "DELETE /clear": "Clear all data",
             "DELETE /clear/{user_id}": "Clear data for specific user",
             "DELETE /delete_context/{context_id}": "Delete a specific context by context_id (requires user_id query param)",
+            "GET /topics": "List a user's conversation topics with counts (requires user_id query param)",
+            "GET /snapshot/export": "Stream a Parquet snapshot (full collection needs X-Snapshot-Token)",
+            "POST /snapshot/import": "Import a Parquet snapshot body (needs X-Snapshot-Token)",
+            "GET /retention/policies": "Get retention policies",
+            "PUT /retention/policies": "Set retention policy for a user, source, or the default",
+            "POST /retention/run": "Run a compaction pass now (optional user_id query param)",
+            "GET /retention/status": "Compaction statistics",
             "GET /health": "Health check"
         }
     }
+    if DEBUG_ENDPOINTS:
+        info["endpoints"].update({
+            "GET /debug/profile": "Download a sampling CPU profile as folded stacks (X-Debug-Token header)",
+            "POST /debug/memory/start": "Start tracemalloc allocation tracking",
+            "POST /debug/memory/snapshot": "Reset the allocation baseline",
+            "GET /debug/memory/diff": "Allocation changes since the baseline",
+            "POST /debug/memory/stop": "Stop allocation tracking",
+            "GET /debug/slow_requests": "Recent slow-request traces"
+        })
+    return info
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,103 @@
+# backend/benchmarks/bench_embedding_profiles.py
+"""
+Benchmark embedding storage profiles: memory per 100k conversations and recall@10.
+
+Uses a synthetic clustered corpus whose variance decays across dimensions,
+so truncating to fewer dimensions behaves like a Matryoshka-style embedding.
+Ground truth is exact cosine top-10 over the full 768-dim float32 vectors.
+Chroma is given the float32 vectors at the profile's dimensions (what the
+app stores); the quantized columns score our own stores (hot tier,
+snapshots) at the profile dtype, and "rerank" re-scores the quantized
+store's top limit * RERANK_OVERSAMPLE against the float32 vectors, as
+/search does on the hot tier.
+
+Run from the backend directory:
+    python benchmarks/bench_embedding_profiles.py [corpus_size] [queries]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import chromadb
+import numpy as np
+
+from constants import EMBEDDING_NATIVE_DIMENSIONS, EMBEDDING_PROFILES, RERANK_OVERSAMPLE
+from utils.embeddings import (
+    dequantize_embeddings,
+    exact_top_k,
+    normalize_embeddings,
+    quantize_embeddings
+)
+
+K = 10
+DTYPE_BYTES = {"float32": 4, "float16": 2, "int8": 1}
+
+
+def make_corpus(n: int, queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    decay = 1.0 / np.sqrt(np.arange(1, EMBEDDING_NATIVE_DIMENSIONS + 1, dtype=np.float32))
+    centers = rng.standard_normal((max(n // 50, 1), EMBEDDING_NATIVE_DIMENSIONS), dtype=np.float32)
+    labels = rng.integers(0, len(centers), n)
+    corpus = (centers[labels] + 0.6 * rng.standard_normal((n, EMBEDDING_NATIVE_DIMENSIONS), dtype=np.float32)) * decay
+    picks = rng.integers(0, n, queries)
+    query = corpus[picks] + 0.3 * rng.standard_normal((queries, EMBEDDING_NATIVE_DIMENSIONS), dtype=np.float32) * decay
+    return normalize_embeddings(corpus), normalize_embeddings(query)
+
+
+def recall(found, truth) -> float:
+    return float(np.mean([len(set(f) & set(t)) / K for f, t in zip(found, truth)]))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    corpus, query = make_corpus(n, queries)
+    truth = [exact_top_k(q, corpus, K)[0] for q in query]
+
+    client = chromadb.EphemeralClient()
+    print(f"corpus={n:,} queries={queries} (memory extrapolated to 100k conversations)\n")
+    print(f"{'profile':<10}{'dims':>6}{'dtype':>9}{'index MB':>10}{'store MB':>10}"
+          f"{'exact':>8}{'hnsw':>8}{'quant':>8}{'rerank':>8}")
+
+    for name, profile in EMBEDDING_PROFILES.items():
+        dims, dtype = profile["dimensions"], profile["dtype"]
+        stored = normalize_embeddings(corpus[:, :dims])
+        quantized = dequantize_embeddings(*quantize_embeddings(stored, dtype))
+        q = normalize_embeddings(query[:, :dims])
+
+        # Chroma keeps float32 vectors; the compact store holds codes + one scale per row
+        index_mb = 100_000 * dims * 4 / 1e6
+        store_mb = 100_000 * (dims * DTYPE_BYTES[dtype] + (4 if dtype == "int8" else 0)) / 1e6
+
+        exact = recall([exact_top_k(v, stored, K)[0] for v in q], truth)
+        quant = recall([exact_top_k(v, quantized, K)[0] for v in q], truth)
+        reranked = []
+        for v in q:
+            candidates, _ = exact_top_k(v, quantized, K * RERANK_OVERSAMPLE)
+            order, _ = exact_top_k(v, stored[candidates], K)
+            reranked.append(candidates[order])
+
+        collection = client.create_collection(f"bench_{name}")
+        for start in range(0, n, 5000):
+            collection.add(
+                ids=[str(i) for i in range(start, min(start + 5000, n))],
+                embeddings=stored[start:start + 5000]
+            )
+
+        hnsw = []
+        started = time.perf_counter()
+        for v in q:
+            res = collection.query(query_embeddings=[v], n_results=K, include=[])
+            hnsw.append([int(i) for i in res["ids"][0]])
+        elapsed = (time.perf_counter() - started) / queries * 1000
+
+        print(f"{name:<10}{dims:>6}{dtype:>9}{index_mb:>10.1f}{store_mb:>10.1f}"
+              f"{exact:>8.3f}{recall(hnsw, truth):>8.3f}{quant:>8.3f}{recall(reranked, truth):>8.3f}"
+              f"   ({elapsed:.2f} ms/query)")
+
+
+if __name__ == "__main__":
+    main()
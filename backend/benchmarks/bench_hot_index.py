@@ -0,0 +1,73 @@
+# backend/benchmarks/bench_hot_index.py
+"""
+Benchmark per-user top-k search: Chroma query with a user_id filter vs the in-memory hot tier.
+
+Run from the backend directory:
+    python benchmarks/bench_hot_index.py [users] [vectors_per_user] [dim]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import chromadb
+import numpy as np
+
+from src.hot_index import HotVectorIndex
+from utils.embeddings import normalize_embeddings
+
+K = 10
+QUERIES = 200
+
+
+def timed(fn, queries):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    dim = int(sys.argv[3]) if len(sys.argv) > 3 else 768
+
+    rng = np.random.default_rng(0)
+    collection = chromadb.EphemeralClient().create_collection("bench_hot_index")
+    for u in range(users):
+        embeddings = normalize_embeddings(rng.standard_normal((per_user, dim), dtype=np.float32))
+        for start in range(0, per_user, 5000):
+            end = min(start + 5000, per_user)
+            collection.add(
+                ids=[f"u{u}-{i}" for i in range(start, end)],
+                embeddings=embeddings[start:end],
+                metadatas=[{"user_id": f"user-{u}"}] * (end - start)
+            )
+
+    user_id = "user-0"
+    queries = normalize_embeddings(rng.standard_normal((QUERIES, dim), dtype=np.float32))
+    print(f"{users} users x {per_user:,} vectors (dim={dim}), top-{K}, {QUERIES} queries\n")
+
+    p50, p99 = timed(
+        lambda q: collection.query(query_embeddings=[q], n_results=K, where={"user_id": user_id}, include=[]),
+        queries
+    )
+    print(f"chroma query + where     p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+    for dtype in ("float32", "float16", "int8"):
+        hot = HotVectorIndex(collection, dim, dtype)
+        start = time.perf_counter()
+        hot.get(user_id)
+        load_ms = (time.perf_counter() - start) * 1000
+        p50, p99 = timed(lambda q: hot.search(user_id, q, K), queries)
+        print(f"hot tier {dtype:<8}        p50 {p50:8.3f} ms   p99 {p99:8.3f} ms"
+              f"   (load {load_ms:.0f} ms, {hot.status()['bytes'] / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
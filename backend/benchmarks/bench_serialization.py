@@ -0,0 +1,99 @@
+# backend/benchmarks/bench_serialization.py
+"""
+Benchmark /get_all serialization time and bytes-on-wire.
+
+Compares stdlib json (what FastAPI's default JSONResponse uses, after
+jsonable_encoder) against orjson, for the "items" and "columns" layouts,
+and reports raw/gzip/brotli response sizes.
+
+Run from the backend directory:
+    python benchmarks/bench_serialization.py
+"""
+
+import json
+import os
+import random
+import string
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import orjson
+
+from utils.compression import brotli, compress_body
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+SIZES = (1_000, 10_000)
+REPEATS = 5
+SOURCES = ("chatgpt", "gemini", "claude")
+
+
+def make_conversations(n: int, seed: int = 0):
+    """Build synthetic Chroma get() results for n conversations"""
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(2000)]
+    ids, documents, metadatas = [], [], []
+    for i in range(n):
+        ids.append(str(uuid.UUID(int=rng.getrandbits(128))))
+        documents.append(" ".join(rng.choices(words, k=rng.randint(150, 600))))
+        metadatas.append({
+            "user_id": "bench-user",
+            "source": rng.choice(SOURCES),
+            "url": f"https://example.com/c/{i}",
+            "time": f"2025-01-{1 + i % 28:02d}T12:00:00",
+            "title": f"Conversation {i}",
+        })
+    return {"ids": ids, "documents": documents, "metadatas": metadatas}
+
+
+def best_of(fn, repeats: int = REPEATS) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    for n in SIZES:
+        results = make_conversations(n)
+        items = {
+            "items": [
+                {"id": i, "text": d, "metadata": m}
+                for i, d, m in zip(results["ids"], results["documents"], results["metadatas"])
+            ],
+            "count": n,
+        }
+        columns = {**results, "count": n}
+
+        print(f"\n=== {n} conversations ===")
+        if jsonable_encoder is not None:
+            t = best_of(lambda: json.dumps(jsonable_encoder(items)).encode("utf-8"))
+            print(f"jsonable_encoder + json (items): {t:8.1f} ms")
+        t = best_of(lambda: json.dumps(items).encode("utf-8"))
+        print(f"json (items):                    {t:8.1f} ms")
+        t = best_of(lambda: orjson.dumps(items))
+        print(f"orjson (items):                  {t:8.1f} ms")
+        t = best_of(lambda: orjson.dumps(columns))
+        print(f"orjson (columns):                {t:8.1f} ms")
+
+        body = orjson.dumps(columns)
+        print(f"bytes raw:    {len(body):>12,}")
+        start = time.perf_counter()
+        gz = compress_body(body, "gzip")
+        print(f"bytes gzip:   {len(gz):>12,}  ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        if brotli is not None:
+            start = time.perf_counter()
+            br = compress_body(body, "br")
+            print(f"bytes brotli: {len(br):>12,}  ({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_snapshot.py
+"""
+Benchmark snapshot export/import throughput against an in-memory Chroma collection.
+
+Run from the backend directory:
+    python benchmarks/bench_snapshot.py [rows] [dim]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import chromadb
+import numpy as np
+
+from constants import SNAPSHOT_BATCH_SIZE
+from src.snapshot import export_snapshot, import_snapshot
+
+
+def populate(collection, rows: int, dim: int):
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, SNAPSHOT_BATCH_SIZE):
+        n = min(SNAPSHOT_BATCH_SIZE, rows - start)
+        collection.add(
+            ids=[f"conv-{start + i}" for i in range(n)],
+            documents=[f"conversation {start + i} " * 40 for i in range(n)],
+            metadatas=[
+                {"user_id": f"user-{(start + i) % 100}", "source": "chatgpt",
+                 "time": "2025-01-01T12:00:00", "title": f"Conversation {start + i}"}
+                for i in range(n)
+            ],
+            embeddings=rng.standard_normal((n, dim), dtype=np.float32)
+        )
+
+
+async def body_chunks(data: bytes, chunk_size: int = 1 << 20):
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 768
+
+    client = chromadb.EphemeralClient()
+    source = client.create_collection("bench_source")
+    print(f"Populating {rows:,} rows (dim={dim})...")
+    populate(source, rows, dim)
+
+    start = time.perf_counter()
+    chunks = []
+    largest_chunk = 0
+    for chunk in export_snapshot(source):
+        chunks.append(chunk)
+        largest_chunk = max(largest_chunk, len(chunk))
+    elapsed = time.perf_counter() - start
+    data = b"".join(chunks)
+    print(f"export: {elapsed:6.2f} s  {rows / elapsed:10,.0f} rows/s  "
+          f"{len(data) / 1e6:8.1f} MB  largest chunk {largest_chunk / 1e6:.1f} MB")
+
+    target = client.create_collection("bench_target")
+    start = time.perf_counter()
+    result = asyncio.run(import_snapshot(body_chunks(data), target))
+    elapsed = time.perf_counter() - start
+    print(f"import: {elapsed:6.2f} s  {result['imported_count'] / elapsed:10,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
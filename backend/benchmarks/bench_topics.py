@@ -0,0 +1,118 @@
+# backend/benchmarks/bench_topics.py
+"""
+Benchmark topic-representative context selection: prompt-token reduction vs coverage.
+
+Uses a synthetic corpus of conversations drawn from topics of skewed size
+(a few recurring topics, a long tail of rare ones). Each topic has its own
+vocabulary mixed with shared filler words, and embeddings are a bag of
+random word vectors, so conversations on the same topic are close. Quality
+is measured without an LLM, as what share of topics and of topic keywords
+survive into the prompt that would be sent to Gemini.
+
+Run from the backend directory:
+    python benchmarks/bench_topics.py [conversations] [topics]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from constants import EMBEDDING_NATIVE_DIMENSIONS, TOPIC_UNASSIGNED
+from src.topics import group_by_topic
+from utils.clustering import choose_k, kmeans
+from utils.formatters import format_conversations_for_prompt, format_topics_for_prompt
+from utils.summarizer import summarize_conversations
+
+WORDS_PER_CONVERSATION = 60
+TOPIC_WORD_SHARE = 0.6
+TOPIC_VOCABULARY = 40
+FILLER_VOCABULARY = 300
+
+
+def make_corpus(n: int, topics: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    topic_words = [[f"t{t}w{i}" for i in range(TOPIC_VOCABULARY)] for t in range(topics)]
+    filler = [f"filler{i}" for i in range(FILLER_VOCABULARY)]
+    word_vectors = {}
+
+    # Zipf-like topic sizes: a few recurring topics, a long tail of rare ones
+    weights = 1.0 / np.arange(1, topics + 1)
+    truth = rng.choice(topics, size=n, p=weights / weights.sum())
+
+    documents, embeddings = [], []
+    for t in truth:
+        words = [
+            topic_words[t][rng.integers(TOPIC_VOCABULARY)] if rng.random() < TOPIC_WORD_SHARE
+            else filler[rng.integers(FILLER_VOCABULARY)]
+            for _ in range(WORDS_PER_CONVERSATION)
+        ]
+        sentences = [" ".join(words[i:i + 12]) + "." for i in range(0, len(words), 12)]
+        documents.append(" ".join(sentences))
+        vector = np.zeros(EMBEDDING_NATIVE_DIMENSIONS, dtype=np.float32)
+        for w in words:
+            if w not in word_vectors:
+                word_vectors[w] = rng.standard_normal(EMBEDDING_NATIVE_DIMENSIONS).astype(np.float32)
+            vector += word_vectors[w]
+        embeddings.append(vector)
+    return documents, np.stack(embeddings), truth, topic_words
+
+
+def tokens(text: str) -> int:
+    # Rough LLM token estimate (~4 characters per token)
+    return len(text) // 4
+
+
+def coverage(prompt: str, topic_words, truth) -> tuple:
+    present = set(prompt.replace(".", " ").split())
+    topics_seen = [t for t in np.unique(truth) if any(w in present for w in topic_words[t])]
+    keywords = [w for t in np.unique(truth) for w in topic_words[t]]
+    return len(topics_seen) / len(np.unique(truth)), sum(w in present for w in keywords) / len(keywords)
+
+
+def purity(labels, truth) -> float:
+    return sum(np.bincount(truth[labels == label]).max() for label in np.unique(labels)) / len(truth)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    topics = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    documents, embeddings, truth, topic_words = make_corpus(n, topics)
+    metadatas = [{"source": "chatgpt", "topic": TOPIC_UNASSIGNED, "time": f"{i:06d}"} for i in range(n)]
+
+    k = choose_k(n)
+    started = time.perf_counter()
+    _, labels = kmeans(embeddings, k)
+    elapsed = (time.perf_counter() - started) * 1000
+    for md, label in zip(metadatas, labels):
+        md["topic"] = int(label)
+    print(f"conversations={n} true topics={topics} k={k} "
+          f"k-means {elapsed:.1f} ms, purity {purity(labels, truth):.3f}\n")
+
+    flat = format_conversations_for_prompt(documents, metadatas)
+    rows = [("flat (all conversations)", flat)]
+    for per_topic in (1, 2, 3):
+        groups = [
+            (count, [documents[i] for i in members], [metadatas[i] for i in members])
+            for count, members in group_by_topic(embeddings, metadatas, per_topic)
+        ]
+        rows.append((f"topics, {per_topic} per topic", format_topics_for_prompt(groups)))
+
+    # Same character budget as 2 per topic, spent without clustering
+    budget = len(rows[2][1])
+    rows.append(("flat, prefix cut to same size", flat[:budget]))
+    rows.append(("extractive, same size", summarize_conversations(documents, metadatas, budget)))
+
+    flat_tokens = tokens(flat)
+    print(f"{'strategy':<32}{'tokens':>8}{'reduction':>11}{'topics':>9}{'keywords':>10}")
+    for name, prompt in rows:
+        topic_cov, keyword_cov = coverage(prompt, topic_words, truth)
+        print(f"{name:<32}{tokens(prompt):>8}{1 - tokens(prompt) / flat_tokens:>10.1%}"
+              f"{topic_cov:>9.2f}{keyword_cov:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# backend/benchmarks/test_circuit_breaker.py
+"""
+Unit tests for the Gemini circuit breaker state machine.
+
+Run from the backend directory:
+    python -m pytest benchmarks
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+OPEN_SECONDS = 0.05
+
+
+def failing():
+    raise RuntimeError("provider outage")
+
+
+def make_breaker(**kwargs):
+    options = {"window_size": 10, "min_calls": 4, "failure_rate": 0.5, "open_seconds": OPEN_SECONDS}
+    return CircuitBreaker("test", **{**options, **kwargs})
+
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        with pytest.raises(RuntimeError):
+            breaker.call(failing)
+
+
+def test_opens_after_failure_rate_and_fails_fast():
+    breaker = make_breaker()
+    breaker.call(lambda: "ok")
+    breaker.call(lambda: "ok")
+    with pytest.raises(RuntimeError):
+        breaker.call(failing)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(RuntimeError):
+        breaker.call(failing)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_probe_success_closes():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(OPEN_SECONDS * 2)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow_request()
+    breaker.record(False, 0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["calls"] == 0
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(OPEN_SECONDS * 2)
+
+    with pytest.raises(RuntimeError):
+        breaker.call(failing)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+
+def test_slow_calls_count_as_failures():
+    breaker = make_breaker(slow_call_seconds=1.0)
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 2.0)
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,75 @@
+# backend/benchmarks/test_hot_index.py
+"""
+Unit tests for the per-user in-memory vector index.
+
+Run from the backend directory:
+    python -m pytest benchmarks
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from src.hot_index import UserVectorIndex
+
+DIMENSIONS = 8
+
+
+def make_index(count, dtype="float32"):
+    embeddings = np.eye(DIMENSIONS, dtype=np.float32)[:count]
+    ids = [f"id{i}" for i in range(count)]
+    return UserVectorIndex(
+        ids, embeddings, DIMENSIONS, dtype,
+        timestamps=[100 * i for i in range(count)],
+        sources=["chatgpt" if i % 2 else "claude" for i in range(count)]
+    )
+
+
+def assert_consistent(index):
+    assert len(index.ids) == index.size == len(index.positions)
+    for position, id_ in enumerate(index.ids):
+        assert index.positions[id_] == position
+        # Each id's row still holds its own one-hot vector, timestamp and source
+        i = int(id_[2:])
+        assert np.argmax(index.matrix[position]) == i
+        assert index.timestamps[position] == 100 * i
+        assert index.sources[position] == index.source_codes["chatgpt" if i % 2 else "claude"]
+
+
+def test_remove_swaps_last_row_into_gap():
+    index = make_index(5)
+    index.remove(["id1"])
+    assert index.ids == ["id0", "id4", "id2", "id3"]
+    assert_consistent(index)
+
+
+def test_remove_last_row_and_unknown_ids():
+    index = make_index(3)
+    index.remove(["id2", "missing"])
+    assert index.ids == ["id0", "id1"]
+    assert_consistent(index)
+
+    index.remove(["id0", "id1"])
+    assert index.size == 0
+    assert index.search(np.ones(DIMENSIONS, dtype=np.float32), 3)[0] == []
+
+
+def test_removed_rows_are_not_returned_by_search():
+    index = make_index(6, dtype="int8")
+    index.remove(["id3", "id0"])
+    assert_consistent(index)
+    ids, scores = index.search(np.eye(DIMENSIONS, dtype=np.float32)[5], 2)
+    assert ids[0] == "id5"
+    assert "id3" not in index.search(np.eye(DIMENSIONS, dtype=np.float32)[3], 4)[0]
+
+
+def test_add_after_remove_reuses_slot_and_filters_still_apply():
+    index = make_index(4)
+    index.remove(["id0"])
+    index.add("id6", np.eye(DIMENSIONS, dtype=np.float32)[6], timestamp=600, source="claude")
+    assert_consistent(index)
+    ids, _ = index.search(np.ones(DIMENSIONS, dtype=np.float32), 10, {"source": "claude", "since": 150})
+    assert sorted(ids) == ["id2", "id6"]
@@ -0,0 +1,66 @@
+# backend/benchmarks/test_retention.py
+"""
+Unit tests for retention policy resolution and expiry selection.
+
+Run from the backend directory:
+    python -m pytest benchmarks
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.retention import resolve_policy, select_expired, select_user_expired
+
+NOW = datetime(2026, 1, 31)
+
+
+def rows(count, source="chatgpt", size=100, prefix=""):
+    return [
+        {"id": f"{prefix}{source}-{i}", "source": source, "size": size,
+         "time": (NOW - timedelta(days=i)).isoformat()}
+        for i in range(count)
+    ]
+
+
+def test_resolve_policy_most_specific_wins():
+    policies = {
+        "default": {"max_age_days": 90, "max_count": 100},
+        "sources": {"claude": {"max_count": 10}},
+        "users": {"u1": {"max_count": 50}}
+    }
+    assert resolve_policy(policies, "u2", "claude") == {"max_age_days": 90, "max_count": 10, "max_bytes": None}
+    assert resolve_policy(policies, "u1", "claude") == {"max_age_days": 90, "max_count": 50, "max_bytes": None}
+    assert resolve_policy(policies, "u2") == {"max_age_days": 90, "max_count": 100, "max_bytes": None}
+
+
+def test_resolve_policy_none_disables_inherited_limit():
+    policies = {"default": {"max_age_days": 90}, "sources": {}, "users": {"u1": {"max_age_days": None}}}
+    assert resolve_policy(policies, "u1", "chatgpt")["max_age_days"] is None
+    assert resolve_policy(policies, "u2", "chatgpt")["max_age_days"] == 90
+
+
+def test_select_expired_by_age_count_and_bytes():
+    conversations = rows(10)
+    assert [c["id"] for c in select_expired(conversations, {"max_age_days": 7}, NOW)] == \
+        ["chatgpt-9", "chatgpt-8"]
+    assert [c["id"] for c in select_expired(conversations, {"max_count": 7}, NOW)] == \
+        ["chatgpt-9", "chatgpt-8", "chatgpt-7"]
+    assert [c["id"] for c in select_expired(conversations, {"max_bytes": 850}, NOW)] == \
+        ["chatgpt-9", "chatgpt-8"]
+    assert select_expired(conversations, {}, NOW) == []
+
+
+def test_select_user_expired_caps_whole_history():
+    policies = {"default": {}, "sources": {}, "users": {"u1": {"max_count": 3}}}
+    expired = select_user_expired(rows(3, "chatgpt") + rows(3, "claude"), policies, "u1", NOW)
+    assert len(expired) == 3
+    assert {c["time"] for c in expired} <= {r["time"] for r in rows(3)[1:]}
+
+
+def test_select_user_expired_applies_source_caps():
+    policies = {"default": {"max_count": 10}, "sources": {"claude": {"max_count": 1}}, "users": {}}
+    expired = select_user_expired(rows(3, "chatgpt") + rows(3, "claude"), policies, "u1", NOW)
+    assert [c["id"] for c in expired] == ["claude-2", "claude-1"]
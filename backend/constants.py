@@ -6,6 +6,64 @@ Constants and configuration for SabkiSoch API
 # Gemini model configuration
 GEMINI_MODEL_NAME = "gemini-2.5-flash"
 EMBEDDING_MODEL_NAME = "models/text-embedding-004"
+EMBEDDING_NATIVE_DIMENSIONS = 768
+
+# Gemini call timeout and circuit breakers (one per operation: embed, title, generate)
+GEMINI_TIMEOUT_SECONDS = 30
+BREAKER_WINDOW_SIZE = 20  # Recent calls used to compute the failure rate
+BREAKER_MIN_CALLS = 5  # Don't trip before this many calls are recorded
+BREAKER_FAILURE_RATE = 0.5  # Open when this share of recent calls failed or were slow
+BREAKER_SLOW_CALL_SECONDS = 10  # Calls slower than this count as failures
+GEMINI_SLOW_CALL_SECONDS = {  # Per-operation slow-call thresholds, below GEMINI_TIMEOUT_SECONDS
+    "embed": 5,
+    "title": 10,
+    "generate": 25,  # Context generation over many conversations routinely takes 10+ s
+    "compact": 25  # Background compaction, kept apart so a slow pass can't trip "generate" for users
+}
+BREAKER_OPEN_SECONDS = 30  # How long to fail fast before a half-open probe
+
+# Embedding backfill for conversations stored while embeddings were unavailable
+BACKFILL_INTERVAL_SECONDS = 30
+BACKFILL_BATCH_SIZE = 20
+BACKFILL_MAX_ATTEMPTS = 5  # Stop retrying a conversation after this many failed embeddings
+
+# In-memory hot tier of per-user embedding matrices
+HOT_INDEX_MEMORY_BUDGET = 256 * 1024 * 1024  # Bytes across all users before LRU eviction
+HOT_INDEX_INITIAL_CAPACITY = 64  # Rows pre-allocated per user
+
+# Topic clustering (k-means over each user's embeddings, labels cached in metadata)
+TOPIC_UNASSIGNED = -1  # "topic" metadata value until a conversation is clustered
+TOPIC_MIN_CONVERSATIONS = 8  # Below this, context generation uses every conversation
+TOPIC_MIN_CLUSTERS = 2
+TOPIC_MAX_CLUSTERS = 40
+TOPIC_KMEANS_ITERATIONS = 50
+TOPIC_RECLUSTER_FRACTION = 0.25  # Re-cluster once unassigned rows exceed this share of clustered ones
+TOPIC_REPRESENTATIVES = 2  # Conversations sent per topic when generating context
+TOPIC_INTERVAL_SECONDS = 300
+TOPIC_SCAN_PAGE_SIZE = 1000
+
+# Debug surface (only mounted when DEBUG_ENDPOINTS=1 and DEBUG_TOKEN is set)
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples (200 Hz)
+PROFILE_MAX_SECONDS = 60  # Longest CPU profile a single request may take
+TRACEMALLOC_MAX_FRAMES = 25  # Deepest traceback kept per allocation
+MEMORY_DIFF_MAX_ENTRIES = 100
+SLOW_TRACE_LOG_SIZE = 200  # Slow-request traces kept in memory (SLOW_REQUEST_MS enables the log)
+
+# Startup metadata migrations
+MIGRATION_BATCH_SIZE = 500
+
+# Embedding storage profiles
+# dimensions: output_dimensionality requested from the embedding model
+# dtype: precision of the vector stores we own (hot tier, snapshots); Chroma always keeps float32
+# rerank: re-score oversampled candidates against Chroma's float32 vectors before returning them
+# Switching profile changes the vector size, so it needs a fresh collection.
+EMBEDDING_PROFILES = {
+    "full": {"dimensions": 768, "dtype": "float32", "rerank": False},
+    "balanced": {"dimensions": 256, "dtype": "float16", "rerank": True},
+    "compact": {"dimensions": 128, "dtype": "int8", "rerank": True},
+}
+DEFAULT_EMBEDDING_PROFILE = "full"
+RERANK_OVERSAMPLE = 4  # Fetch limit * RERANK_OVERSAMPLE candidates to re-rank
 
 # Context generation prompt template
 CONTEXT_GENERATION_PROMPT = """You are an AI assistant that helps create context summaries from conversations. 
@@ -33,12 +91,49 @@ MAX_TEXT_LENGTH = 30000  # Reduced to stay well under 36KB payload limit
 MAX_USER_ID_LENGTH = 100
 MAX_SOURCE_LENGTH = 50
 MAX_URL_LENGTH = 2000
+MAX_SEARCH_LIMIT = 50
 
 # Payload size limits
 PAYLOAD_SIZE_LIMIT = 36000  # 36KB in bytes
 PAYLOAD_SIZE_BUFFER = 1000  # Buffer to stay under limit
 PAYLOAD_BASE_SIZE = 200  # JSON structure overhead
 
+# /get_all response layouts ("columns" skips per-item dict construction)
+GET_ALL_LAYOUTS = ("items", "columns")
+
+# Response compression
+COMPRESSION_MINIMUM_SIZE = 1024  # Don't compress bodies smaller than 1KB
+GZIP_COMPRESSION_LEVEL = 6
+BROTLI_COMPRESSION_QUALITY = 5
+
+# Conditional requests: clients may cache, but must revalidate with If-None-Match
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+# Snapshot export/import
+SNAPSHOT_BATCH_SIZE = 1000  # Rows per Chroma page / Parquet row group
+SNAPSHOT_UPSERT_BATCH_SIZE = 100  # Rows per import upsert; Chroma holds the GIL for the whole call
+SNAPSHOT_PARQUET_COMPRESSION = "zstd"
+
+# Extractive summarizer (local fallback / prompt pre-filter)
+SUMMARIZER_TEXTRANK_MAX_SENTENCES = 400  # Above this, score by centroid similarity instead
+SUMMARIZER_DAMPING = 0.85
+SUMMARIZER_ITERATIONS = 30
+SUMMARIZER_MIN_SENTENCE_WORDS = 3
+SUMMARIZER_MAX_VOCABULARY = 512  # Most widespread terms kept as TF-IDF features, bounding the sentence matrix
+SUMMARIZER_MIN_SHARE = 200  # Minimum characters per conversation in multi-conversation summaries
+PREFILTER_PROMPT_BUDGET = 20000  # Characters of conversation text sent to Gemini when pre-filtering
+
+# Retention and compaction
+RETENTION_POLICY_FILE = "./retention_policies.json"
+RETENTION_POLICY_FIELDS = ("max_age_days", "max_count", "max_bytes")
+RETENTION_INTERVAL_SECONDS = 3600  # How often the background compaction pass runs
+COMPACTION_BATCH_SIZE = 20  # Conversations merged into one summary record
+COMPACTION_MIN_BATCH_SIZE = 5  # Hold back a source's expired conversations until this many accumulate
+COMPACTION_MAX_TITLES = 500  # Original titles kept on a summary record, newest first
+COMPACTION_BATCH_PAUSE = 0.05  # Seconds to yield between batches
+COMPACTION_SUMMARY_LENGTH = 2000
+SUMMARY_RECORD_KIND = "summary"
+
 # ChromaDB configuration
 COLLECTION_NAME = "ai_memory"
 
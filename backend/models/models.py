@@ -66,3 +66,24 @@ class ContextRequest(BaseModel):
     """Request model for generating context from conversations"""
     user_id: str
     max_length: Optional[int] = 2000  # Max length for generated context
+    prefilter: Optional[bool] = False  # Shrink the prompt with the extractive summarizer first
+    topics: Optional[bool] = False  # Send only a few representative conversations per topic
+    since: Optional[str] = None  # Only conversations at/after this time (epoch seconds or ISO 8601)
+    until: Optional[str] = None  # Only conversations at/before this time
+    source: Optional[str] = None  # Only conversations from this source
+
+
+class RetentionPolicyRequest(BaseModel):
+    """Request model for setting a retention policy (no user_id/source sets the default)"""
+    user_id: Optional[str] = None
+    source: Optional[str] = None
+    max_age_days: Optional[int] = None
+    max_count: Optional[int] = None
+    max_bytes: Optional[int] = None
+    
+    @field_validator('max_age_days', 'max_count', 'max_bytes')
+    @classmethod
+    def validate_limit(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('retention limits must be non-negative')
+        return v
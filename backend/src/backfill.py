@@ -0,0 +1,170 @@
+# backend/src/backfill.py
+"""
+Backfill of embeddings for conversations stored while Gemini embeddings were unavailable
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Any
+
+from constants import (
+    BACKFILL_INTERVAL_SECONDS,
+    BACKFILL_BATCH_SIZE,
+    BACKFILL_MAX_ATTEMPTS
+)
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.etags import CONTENT_VERSIONS
+from utils.gemini import GEMINI_BREAKERS
+
+PENDING_FILTER = {"$and": [{"embedding_pending": True}, {"embedding_failed": {"$ne": True}}]}
+FAILED_FILTER = {"embedding_failed": True}
+
+
+def _backfill_batch(collection, gemini_ef, hot_index=None, offset: int = 0) -> Dict[str, int]:
+    """
+    Embed one batch of pending conversations, one row at a time.
+
+    A row that fails while the embed circuit stays closed has its attempt
+    count recorded and stays pending, so the caller moves the offset past it
+    for the rest of the pass. After BACKFILL_MAX_ATTEMPTS such failures it is
+    marked embedding_failed and leaves the queue (it stays embedding_pending,
+    so its placeholder is never searched). A failure that opens the circuit
+    on a row that never failed before is treated as an outage: it only moves
+    the row behind the others, so the next half-open probe uses a different
+    row, and ends the pass.
+
+    Returns:
+        Dictionary with rows fetched, embedded, and retried (left pending for a later pass)
+
+    Raises:
+        CircuitOpenError: If the embed circuit opens (the outage isn't the row's fault)
+    """
+    results = collection.get(
+        where=PENDING_FILTER,
+        limit=BACKFILL_BATCH_SIZE,
+        offset=offset,
+        include=["documents", "metadatas"]
+    )
+    ids = results.get("ids") or []
+    # Rows that failed before go last, so a row that can never be embedded isn't
+    # the half-open probe that keeps the embed circuit from closing
+    rows = sorted(
+        zip(ids, results.get("documents") or [], results.get("metadatas") or []),
+        key=lambda row: (row[2].get("embedding_attempts") or 0, row[2].get("embedding_probes") or 0)
+    )
+    embedded, retried, users = 0, 0, set()
+    try:
+        for id_, document, md in rows:
+            try:
+                embedding = gemini_ef([document])[0]
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                outage = GEMINI_BREAKERS["embed"].state != CircuitBreaker.CLOSED
+                if outage and not md.get("embedding_attempts"):
+                    update = {"embedding_probes": (md.get("embedding_probes") or 0) + 1}
+                    collection.update(ids=[id_], metadatas=[{**md, **update}])
+                    raise CircuitOpenError(f"Circuit 'embed' opened: {e}")
+
+                # A row that already failed counts its attempt even if it re-opened the
+                # circuit, since only known-bad rows are left to probe with by then
+                attempts = (md.get("embedding_attempts") or 0) + 1
+                update = {"embedding_attempts": attempts}
+                if attempts >= BACKFILL_MAX_ATTEMPTS:
+                    print(f"Giving up on embedding {id_} after {attempts} attempts: {e}")
+                    update["embedding_failed"] = True
+                else:
+                    retried += 1
+                collection.update(ids=[id_], metadatas=[{**md, **update}])
+                if outage:
+                    raise CircuitOpenError(f"Circuit 'embed' opened: {e}")
+                continue
+
+            collection.update(ids=[id_], embeddings=[embedding], metadatas=[{**md, "embedding_pending": False}])
+            embedded += 1
+            users.add(md.get("user_id"))
+    finally:
+        for user_id in users:
+            CONTENT_VERSIONS.bump(user_id)
+            if hot_index is not None:
+                hot_index.invalidate(user_id)
+    return {"fetched": len(ids), "embedded": embedded, "retried": retried}
+
+
+class EmbeddingBackfillJob:
+    """Background job that embeds queued conversations once the embed circuit allows it"""
+
+    def __init__(self, collection, gemini_ef, hot_index=None, interval: int = BACKFILL_INTERVAL_SECONDS):
+        self.collection = collection
+        self.gemini_ef = gemini_ef
+        self.hot_index = hot_index
+        self.interval = interval
+        self.task = None
+        self.stats = {
+            "backfilled": 0,
+            "last_run": None,
+            "last_error": None
+        }
+
+    async def run_once(self) -> int:
+        """
+        Backfill pending embeddings until none are left or the embed circuit opens.
+
+        Returns:
+            Number of conversations backfilled in this pass
+        """
+        backfilled = 0
+        offset = 0
+        while True:
+            try:
+                # While the circuit is open this fails fast; after the cool-down
+                # the first embedding acts as the half-open probe
+                batch = await asyncio.to_thread(
+                    _backfill_batch, self.collection, self.gemini_ef, self.hot_index, offset
+                )
+            except CircuitOpenError:
+                break
+            if batch["fetched"] == 0:
+                break
+            backfilled += batch["embedded"]
+            # Rows that failed stay in the queue; each is retried once per pass
+            offset += batch["retried"]
+            await asyncio.sleep(0)
+
+        if backfilled:
+            print(f"✅ Backfilled embeddings for {backfilled} conversations")
+        self.stats["backfilled"] += backfilled
+        self.stats["last_run"] = datetime.now().isoformat()
+        return backfilled
+
+    def status(self) -> Dict[str, Any]:
+        """Report backfill statistics and the current queue length"""
+        try:
+            pending = len(self.collection.get(where=PENDING_FILTER, include=[]).get("ids") or [])
+            failed = len(self.collection.get(where=FAILED_FILTER, include=[]).get("ids") or [])
+        except Exception:
+            pending = failed = None
+        return {**self.stats, "pending": pending, "failed": failed}
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+                self.stats["last_error"] = None
+            except Exception as e:
+                print(f"Error backfilling embeddings: {e}")
+                self.stats["last_error"] = str(e)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
@@ -13,16 +13,22 @@ from constants import (
     MAX_TEXT_LENGTH,
     PAYLOAD_SIZE_LIMIT,
     PAYLOAD_SIZE_BUFFER,
+    GET_ALL_LAYOUTS,
+    TOPIC_UNASSIGNED,
     estimate_payload_size
 )
 from models.models import StoreRequest
+from utils.etags import CONTENT_VERSIONS
+from utils.filters import build_where
 from utils.gemini import generate_title_with_gemini
+from utils.tracing import span
 
 
 async def store_conversation(
     req: StoreRequest, 
     collection, 
-    gemini_ef
+    gemini_ef,
+    hot_index=None
 ) -> Dict[str, Any]:
     """
     Store a conversation in the database with embedding and metadata.
@@ -31,6 +37,7 @@ async def store_conversation(
         req: StoreRequest object with conversation data
         collection: ChromaDB collection instance
         gemini_ef: Gemini embedding function
+        hot_index: Optional HotVectorIndex to keep in sync
         
     Returns:
         Dictionary with success status and conversation ID
@@ -40,7 +47,8 @@ async def store_conversation(
     """
     try:
         # Check payload size and truncate if necessary
-        estimated_size = estimate_payload_size(req.user_id, req.source, req.text, req.url)
+        with span("payload.estimate"):
+            estimated_size = estimate_payload_size(req.user_id, req.source, req.text, req.url)
         if estimated_size > (PAYLOAD_SIZE_LIMIT - PAYLOAD_SIZE_BUFFER):
             # Calculate how much to truncate
             current_text_size = len(req.text.encode('utf-8'))
@@ -57,8 +65,15 @@ async def store_conversation(
         if not req.text or not req.text.strip():
             raise HTTPException(status_code=422, detail="Text content cannot be empty")
         
-        # Generate embedding using Gemini
-        embedding = gemini_ef([req.text])[0]
+        # Generate embedding using Gemini; during an outage store a placeholder
+        # and let the backfill job embed it once the circuit closes
+        try:
+            embedding = gemini_ef([req.text])[0]
+            embedding_pending = False
+        except Exception as e:
+            print(f"Embedding unavailable, queued for backfill: {e}")
+            embedding = [0.0] * gemini_ef.dimensions
+            embedding_pending = True
         
         # Create unique ID
         uid = str(uuid.uuid4())
@@ -73,8 +88,12 @@ async def store_conversation(
             "source": req.source, 
             "url": req.url,
             "time": time.isoformat(),  # Convert datetime to ISO format string
-            "title": title
+            "timestamp": int(time.timestamp()),  # Epoch seconds for range filters
+            "title": title,
+            "topic": TOPIC_UNASSIGNED  # Assigned by the topic clustering job
         }
+        if embedding_pending:
+            metadata["embedding_pending"] = True
         
         # Add to chroma collection with pre-computed embedding
         collection.add(
@@ -83,10 +102,13 @@ async def store_conversation(
             ids=[uid],
             embeddings=[embedding]
         )
+        if hot_index is not None and not embedding_pending:
+            hot_index.add(req.user_id, uid, embedding, metadata)
+        CONTENT_VERSIONS.bump(req.user_id)
 
         print(f"Metadata: {metadata}")
         
-        return {"ok": True, "id": uid}
+        return {"ok": True, "id": uid, "embedding_pending": embedding_pending}
         
     except HTTPException:
         raise
@@ -95,16 +117,24 @@ async def store_conversation(
         raise HTTPException(status_code=500, detail=f"Failed to store data: {str(e)}")
 
 
-async def get_all_conversations(user_id: str, collection) -> Dict[str, Any]:
+async def get_all_conversations(
+    user_id: str,
+    collection,
+    layout: str = "items",
+    filters: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
     """
     Retrieve all conversations for a specific user.
     
     Args:
         user_id: The user ID to retrieve conversations for
         collection: ChromaDB collection instance
+        layout: "items" for a list of {id, text, metadata} objects, or "columns"
+            to return Chroma's parallel ids/documents/metadatas lists as-is
+        filters: Optional since/until/source filters (see utils.filters.parse_filters)
         
     Returns:
-        Dictionary with items list and count
+        Dictionary with items list (or columns) and count
         
     Raises:
         HTTPException: If validation fails or retrieval error occurs
@@ -117,29 +147,35 @@ async def get_all_conversations(user_id: str, collection) -> Dict[str, Any]:
         if len(user_id) > MAX_USER_ID_LENGTH:
             raise HTTPException(status_code=400, detail=f"user_id too long (max {MAX_USER_ID_LENGTH} characters)")
         
+        if layout not in GET_ALL_LAYOUTS:
+            raise HTTPException(status_code=400, detail=f"layout must be one of: {', '.join(GET_ALL_LAYOUTS)}")
+        
         user_id = user_id.strip()
         
-        # Use get() method for metadata-based retrieval
+        # Use get() method for metadata-based retrieval (embeddings are not needed)
         try:
             results = collection.get(
-                where={"user_id": user_id}
+                where=build_where(user_id, filters),
+                include=["documents", "metadatas"]
             )
         except Exception as get_error:
             # Return empty results if query fails
+            if layout == "columns":
+                return {"ids": [], "documents": [], "metadatas": [], "count": 0}
             return {"items": [], "count": 0}
         
-        # Format results
-        docs = []
-        documents = results.get("documents", [])
-        metadatas = results.get("metadatas", [])
-        ids = results.get("ids", [])
+        documents = results.get("documents") or []
+        metadatas = results.get("metadatas") or []
+        ids = results.get("ids") or []
+        
+        if layout == "columns":
+            # Hand Chroma's lists straight to the serializer
+            return {"ids": ids, "documents": documents, "metadatas": metadatas, "count": len(ids)}
         
-        for doc, md, id_ in zip(documents, metadatas, ids):
-            docs.append({
-                "id": id_, 
-                "text": doc, 
-                "metadata": md
-            })
+        docs = [
+            {"id": id_, "text": doc, "metadata": md}
+            for id_, doc, md in zip(ids, documents, metadatas)
+        ]
         
         return {"items": docs, "count": len(docs)}
         
@@ -149,12 +185,13 @@ async def get_all_conversations(user_id: str, collection) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve data: {str(e)}")
 
 
-async def clear_all_data(collection) -> Dict[str, Any]:
+async def clear_all_data(collection, hot_index=None) -> Dict[str, Any]:
     """
     Clear all data from ChromaDB collection.
     
     Args:
         collection: ChromaDB collection instance
+        hot_index: Optional HotVectorIndex to keep in sync
         
     Returns:
         Dictionary with success status and deleted count
@@ -175,11 +212,15 @@ async def clear_all_data(collection) -> Dict[str, Any]:
         
         # Delete all documents
         if doc_count > 0:
-            collection.delete()
+            collection.delete(ids=all_docs["ids"])
             print(f"✅ Deleted {doc_count} documents")
         else:
             print("ℹ️ No documents found to delete")
         
+        if hot_index is not None:
+            hot_index.invalidate()
+        CONTENT_VERSIONS.bump()
+        
         return {
             "ok": True, 
             "message": f"Cleared {doc_count} documents from ChromaDB",
@@ -191,13 +232,14 @@ async def clear_all_data(collection) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error clearing data: {str(e)}")
 
 
-async def clear_user_data(user_id: str, collection) -> Dict[str, Any]:
+async def clear_user_data(user_id: str, collection, hot_index=None) -> Dict[str, Any]:
     """
     Clear all data for a specific user.
     
     Args:
         user_id: The user ID to clear data for
         collection: ChromaDB collection instance
+        hot_index: Optional HotVectorIndex to keep in sync
         
     Returns:
         Dictionary with success status and deleted count
@@ -224,6 +266,10 @@ async def clear_user_data(user_id: str, collection) -> Dict[str, Any]:
             collection.delete(where={"user_id": user_id})
             print(f"✅ Deleted {doc_count} documents for user {user_id}")
         
+        if hot_index is not None:
+            hot_index.invalidate(user_id)
+        CONTENT_VERSIONS.bump(user_id)
+        
         return {
             "ok": True, 
             "message": f"Cleared {doc_count} documents for user {user_id}",
@@ -238,7 +284,7 @@ async def clear_user_data(user_id: str, collection) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error clearing user data: {str(e)}")
 
 
-async def delete_context_by_id(context_id: str, user_id: str, collection) -> Dict[str, Any]:
+async def delete_context_by_id(context_id: str, user_id: str, collection, hot_index=None) -> Dict[str, Any]:
     """
     Delete a specific context by context_id, verifying it belongs to user_id.
     
@@ -246,6 +292,7 @@ async def delete_context_by_id(context_id: str, user_id: str, collection) -> Dic
         context_id: The context ID to delete
         user_id: The user ID (to verify ownership)
         collection: ChromaDB collection instance
+        hot_index: Optional HotVectorIndex to keep in sync
         
     Returns:
         Dictionary with success status and deleted context info
@@ -296,6 +343,9 @@ async def delete_context_by_id(context_id: str, user_id: str, collection) -> Dic
         # Delete the context by ID
         try:
             collection.delete(ids=[context_id])
+            if hot_index is not None:
+                hot_index.remove(user_id, [context_id])
+            CONTENT_VERSIONS.bump(user_id)
             print(f"✅ Deleted context {context_id} for user {user_id}")
         except Exception as e:
             print(f"Error deleting context: {e}")
@@ -3,19 +3,28 @@
 Context generation functions for creating intelligent summaries from conversations
 """
 
+import asyncio
 from fastapi import HTTPException
 from typing import Dict, Any
 
 from constants import (
     MAX_CONTEXT_LENGTH,
-    CONTEXT_GENERATION_PROMPT
+    CONTEXT_GENERATION_PROMPT,
+    PREFILTER_PROMPT_BUDGET
 )
 from models.models import ContextRequest
+from src.topics import select_topic_representatives
+from utils.filters import build_where, parse_filters
 from utils.gemini import generate_context_with_gemini
 from utils.formatters import (
     format_conversations_for_prompt,
+    format_topics_for_prompt,
     format_single_conversation_for_prompt
 )
+from utils.summarizer import (
+    summarize_extractive,
+    summarize_conversations
+)
 
 
 async def generate_context_from_all_conversations(
@@ -42,11 +51,21 @@ async def generate_context_from_all_conversations(
         user_id = request.user_id.strip()
         max_length = min(request.max_length or 2000, MAX_CONTEXT_LENGTH)
         
-        # Get all conversations for the user
+        # Get all conversations for the user (or a few per topic)
+        topic_groups = None
         try:
-            results = collection.get(where={"user_id": user_id})
-            documents = results.get("documents", [])
-            metadatas = results.get("metadatas", [])
+            filters = parse_filters(request.since, request.until, request.source)
+            if request.topics:
+                selection = await asyncio.to_thread(select_topic_representatives, user_id, collection, filters)
+                topic_groups = selection["groups"]
+                documents = [doc for _, docs, _ in topic_groups for doc in docs]
+                metadatas = [md for _, _, mds in topic_groups for md in mds]
+                conversation_count = selection["conversation_count"]
+            else:
+                results = collection.get(where=build_where(user_id, filters))
+                documents = results.get("documents", [])
+                metadatas = results.get("metadatas", [])
+                conversation_count = len(documents)
             
             if not documents:
                 return {
@@ -54,11 +73,20 @@ async def generate_context_from_all_conversations(
                     "summary": "No previous conversations found",
                     "conversation_count": 0
                 }
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving conversations: {str(e)}")
         
         # Prepare conversation data for Gemini
-        conversations_text = format_conversations_for_prompt(documents, metadatas)
+        if topic_groups is not None:
+            conversations_text = format_topics_for_prompt(topic_groups)
+        elif request.prefilter:
+            conversations_text = "Previous conversations:\n" + await asyncio.to_thread(
+                summarize_conversations, documents, metadatas, PREFILTER_PROMPT_BUDGET
+            )
+        else:
+            conversations_text = format_conversations_for_prompt(documents, metadatas)
         
         # Generate intelligent context using Gemini
         prompt = CONTEXT_GENERATION_PROMPT.format(
@@ -69,22 +97,29 @@ async def generate_context_from_all_conversations(
         generated_context, success = generate_context_with_gemini(prompt, max_length)
         
         if success:
-            return {
+            response = {
                 "context": generated_context,
-                "summary": f"Generated intelligent context from {len(documents)} conversations",
-                "conversation_count": len(documents),
+                "summary": f"Generated intelligent context from {conversation_count} conversations",
+                "conversation_count": conversation_count,
                 "context_length": len(generated_context)
             }
         else:
-            # Fallback to simple concatenation if Gemini fails
-            fallback_context = f"Previous conversations ({len(documents)} total):\n\n" + conversations_text[:max_length]
-            return {
+            # Fallback to a local extractive summary if Gemini fails
+            header = f"Previous conversations ({conversation_count} total):\n\n"
+            fallback_context = header + await asyncio.to_thread(
+                summarize_conversations, documents, metadatas, max_length - len(header)
+            )
+            response = {
                 "context": fallback_context,
-                "summary": f"Fallback context from {len(documents)} conversations",
-                "conversation_count": len(documents),
+                "summary": f"Fallback context from {conversation_count} conversations",
+                "conversation_count": conversation_count,
                 "context_length": len(fallback_context),
-                "note": "Gemini generation failed, using fallback"
+                "note": "Gemini generation failed, using extractive summary"
             }
+        if topic_groups is not None:
+            response["topic_count"] = len(topic_groups)
+            response["representative_count"] = len(documents)
+        return response
         
     except HTTPException:
         raise
@@ -163,8 +198,11 @@ async def generate_context_from_specific_conversation(
                 "context_length": len(generated_context)
             }
         else:
-            # Fallback to simple text if Gemini fails
-            fallback_context = f"Context from {metadata.get('source', 'unknown')}:\n\n{document[:max_length]}"
+            # Fallback to a local extractive summary if Gemini fails
+            header = f"Context from {metadata.get('source', 'unknown')}:\n\n"
+            fallback_context = header + await asyncio.to_thread(
+                summarize_extractive, document, max_length - len(header)
+            )
             return {
                 "context": fallback_context,
                 "summary": f"Fallback context from conversation: {metadata.get('title', 'Untitled')}",
@@ -173,7 +211,7 @@ async def generate_context_from_specific_conversation(
                 "source": metadata.get('source', 'unknown'),
                 "time": metadata.get('time'),
                 "context_length": len(fallback_context),
-                "note": "Gemini generation failed, using fallback"
+                "note": "Gemini generation failed, using extractive summary"
             }
         
     except HTTPException:
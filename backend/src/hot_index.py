@@ -0,0 +1,263 @@
+# backend/src/hot_index.py
+"""
+In-memory hot tier of per-user embedding matrices for exact brute-force similarity search
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from constants import (
+    HOT_INDEX_MEMORY_BUDGET,
+    HOT_INDEX_INITIAL_CAPACITY
+)
+from utils.embeddings import normalize_embeddings, quantize_embeddings
+
+
+class UserVectorIndex:
+    """
+    Contiguous matrix of one user's normalized embeddings plus a parallel id array.
+
+    Rows are stored in the embedding profile dtype. Inserts append into spare
+    capacity (doubling when full) and deletes swap the last row into the gap,
+    so both are O(dimensions). Each row also carries its epoch timestamp and a
+    source code so time/source filters can be applied as a mask.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        dimensions: int,
+        dtype: str,
+        timestamps: List[int] | None = None,
+        sources: List[str] | None = None
+    ):
+        self.dimensions = dimensions
+        self.dtype = dtype
+        self.size = 0
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.source_codes: Dict[str, int] = {}
+
+        capacity = max(len(ids), HOT_INDEX_INITIAL_CAPACITY)
+        self.matrix = np.zeros((capacity, dimensions), dtype=dtype)
+        self.scales = np.ones(capacity, dtype=np.float32)
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.sources = np.zeros(capacity, dtype=np.int32)
+        if ids:
+            self._append(ids, embeddings, timestamps or [0] * len(ids), sources or ["unknown"] * len(ids))
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.scales.nbytes + self.timestamps.nbytes + self.sources.nbytes
+
+    def _append(self, ids: List[str], embeddings: np.ndarray, timestamps: List[int], sources: List[str]):
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), self.dimensions)
+        codes, scales = quantize_embeddings(normalize_embeddings(embeddings), self.dtype)
+
+        needed = self.size + len(ids)
+        if needed > len(self.matrix):
+            capacity = max(needed, len(self.matrix) * 2)
+            matrix = np.zeros((capacity, self.dimensions), dtype=self.dtype)
+            matrix[:self.size] = self.matrix[:self.size]
+            self.matrix = matrix
+            self.scales = np.resize(self.scales, capacity)
+            self.timestamps = np.resize(self.timestamps, capacity)
+            self.sources = np.resize(self.sources, capacity)
+
+        self.matrix[self.size:needed] = codes
+        self.scales[self.size:needed] = scales
+        self.timestamps[self.size:needed] = [t or 0 for t in timestamps]
+        self.sources[self.size:needed] = [self.source_codes.setdefault(s, len(self.source_codes)) for s in sources]
+        for offset, id_ in enumerate(ids):
+            self.positions[id_] = self.size + offset
+        self.ids.extend(ids)
+        self.size = needed
+
+    def add(self, id_: str, embedding, timestamp: int | None = None, source: str = "unknown") -> None:
+        """Insert (or replace) one embedding"""
+        if id_ in self.positions:
+            self.remove([id_])
+        self._append([id_], embedding, [timestamp], [source])
+
+    def remove(self, ids: List[str]) -> None:
+        """Delete embeddings by id (unknown ids are ignored)"""
+        for id_ in ids:
+            position = self.positions.pop(id_, None)
+            if position is None:
+                continue
+            last = self.size - 1
+            if position != last:
+                moved = self.ids[last]
+                self.matrix[position] = self.matrix[last]
+                self.scales[position] = self.scales[last]
+                self.timestamps[position] = self.timestamps[last]
+                self.sources[position] = self.sources[last]
+                self.ids[position] = moved
+                self.positions[moved] = position
+            self.ids.pop()
+            self.size = last
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray | None:
+        """Boolean row mask for parsed since/until/source filters (None when unfiltered)"""
+        mask = None
+        if filters.get("since") is not None:
+            mask = self.timestamps[:self.size] >= filters["since"]
+        if filters.get("until") is not None:
+            upper = self.timestamps[:self.size] <= filters["until"]
+            mask = upper if mask is None else mask & upper
+        if filters.get("source"):
+            code = self.source_codes.get(filters["source"], -1)
+            same = self.sources[:self.size] == code
+            mask = same if mask is None else mask & same
+        return mask
+
+    def search(self, query: np.ndarray, k: int, filters: Dict[str, Any] | None = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Exact top-k by cosine similarity: one matrix-vector product over all rows.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            filters: Optional parsed since/until/source filters
+
+        Returns:
+            Tuple of (ids, scores), best first
+        """
+        if self.size == 0 or k <= 0:
+            return [], np.empty(0, dtype=np.float32)
+
+        query = normalize_embeddings(query)
+        scores = (self.matrix[:self.size] @ query) * self.scales[:self.size]
+
+        mask = self._filter_mask(filters or {})
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return [], np.empty(0, dtype=np.float32)
+            k = min(k, len(candidates))
+            top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            top = top[np.argsort(-scores[top])]
+            return [self.ids[i] for i in top], scores[top]
+
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.ids[i] for i in top], scores[top]
+
+
+class HotVectorIndex:
+    """
+    LRU cache of UserVectorIndex objects under a global memory budget.
+
+    A user's matrix is loaded from Chroma on first access and kept up to date
+    by store/delete; bulk operations (clear, compaction, backfill, import)
+    invalidate it so it is reloaded on next use.
+    """
+
+    def __init__(self, collection, dimensions: int, dtype: str, memory_budget: int = HOT_INDEX_MEMORY_BUDGET):
+        self.collection = collection
+        self.dimensions = dimensions
+        self.dtype = dtype
+        self.memory_budget = memory_budget
+        self.users: "OrderedDict[str, UserVectorIndex]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0  # Bumped by invalidate() so in-flight loads are discarded
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _load(self, user_id: str) -> UserVectorIndex:
+        results = self.collection.get(where={"user_id": user_id}, include=["embeddings", "metadatas"])
+        ids = results.get("ids") or []
+        metadatas = results.get("metadatas") or []
+        embeddings = results.get("embeddings")
+        if embeddings is None or len(ids) == 0:
+            return UserVectorIndex([], np.empty((0, self.dimensions)), self.dimensions, self.dtype)
+
+        # Rows awaiting an embedding backfill only hold a placeholder vector
+        keep = [i for i, md in enumerate(metadatas) if not (md or {}).get("embedding_pending")]
+        embeddings = np.asarray(embeddings, dtype=np.float32)[keep]
+        return UserVectorIndex(
+            [ids[i] for i in keep],
+            embeddings,
+            self.dimensions,
+            self.dtype,
+            timestamps=[metadatas[i].get("timestamp") for i in keep],
+            sources=[metadatas[i].get("source", "unknown") for i in keep]
+        )
+
+    def _evict(self):
+        total = sum(index.nbytes for index in self.users.values())
+        while total > self.memory_budget and len(self.users) > 1:
+            _, evicted = self.users.popitem(last=False)
+            total -= evicted.nbytes
+            self.stats["evictions"] += 1
+
+    def get(self, user_id: str) -> UserVectorIndex:
+        """Return the user's index, loading it from Chroma on a miss"""
+        with self.lock:
+            index = self.users.get(user_id)
+            if index is not None:
+                self.users.move_to_end(user_id)
+                self.stats["hits"] += 1
+                return index
+            generation = self.generation
+
+        index = self._load(user_id)
+        with self.lock:
+            self.stats["misses"] += 1
+            if generation == self.generation:
+                self.users[user_id] = index
+                self.users.move_to_end(user_id)
+                self._evict()
+        return index
+
+    def search(
+        self,
+        user_id: str,
+        query,
+        k: int,
+        filters: Dict[str, Any] | None = None
+    ) -> Tuple[List[str], np.ndarray]:
+        """Exact top-k search over a user's embeddings, optionally filtered"""
+        index = self.get(user_id)
+        with self.lock:
+            return index.search(np.asarray(query, dtype=np.float32), k, filters)
+
+    def add(self, user_id: str, id_: str, embedding, metadata: Dict[str, Any] | None = None) -> None:
+        """Add an embedding if the user's index is loaded (otherwise it is picked up on load)"""
+        metadata = metadata or {}
+        with self.lock:
+            index = self.users.get(user_id)
+            if index is not None:
+                index.add(id_, embedding, metadata.get("timestamp"), metadata.get("source", "unknown"))
+                self._evict()
+
+    def remove(self, user_id: str, ids: List[str]) -> None:
+        """Remove embeddings from the user's index if it is loaded"""
+        with self.lock:
+            index = self.users.get(user_id)
+            if index is not None:
+                index.remove(ids)
+
+    def invalidate(self, user_id: str | None = None) -> None:
+        """Drop one user's index, or every index when user_id is None"""
+        with self.lock:
+            self.generation += 1
+            if user_id is None:
+                self.users.clear()
+            else:
+                self.users.pop(user_id, None)
+
+    def status(self) -> Dict[str, Any]:
+        """Report cache occupancy and hit statistics"""
+        with self.lock:
+            return {
+                **self.stats,
+                "users": len(self.users),
+                "vectors": sum(index.size for index in self.users.values()),
+                "bytes": sum(index.nbytes for index in self.users.values()),
+                "memory_budget": self.memory_budget
+            }
@@ -0,0 +1,181 @@
+# backend/src/migrations.py
+"""
+One-off metadata migrations for conversations stored by older versions
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from constants import MIGRATION_BATCH_SIZE, TOPIC_UNASSIGNED
+from utils.etags import CONTENT_VERSIONS
+from utils.filters import timestamp_from_iso
+
+
+def _migrate_metadata(
+    collection,
+    upgrade: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    hot_index=None,
+    stopping: Optional[threading.Event] = None
+) -> int:
+    """
+    Page through every row and write back the metadata upgrade() changed.
+
+    upgrade returns the new metadata for a row, or None to leave it alone.
+    Migrations run in the background at startup, so each batch bumps its
+    users' ETags and, when given a hot index, drops their hot-tier matrices.
+    Setting stopping ends the pass after the current batch.
+
+    Returns:
+        Number of rows migrated
+    """
+    migrated = 0
+    offset = 0
+    while stopping is None or not stopping.is_set():
+        results = collection.get(limit=MIGRATION_BATCH_SIZE, offset=offset, include=["metadatas"])
+        ids = results.get("ids") or []
+        if not ids:
+            break
+
+        update_ids, update_metadatas, user_ids = [], [], set()
+        for id_, md in zip(ids, results["metadatas"]):
+            upgraded = upgrade(md or {})
+            if upgraded is None:
+                continue
+            update_ids.append(id_)
+            update_metadatas.append(upgraded)
+            user_ids.add(upgraded.get("user_id"))
+
+        if update_ids:
+            collection.update(ids=update_ids, metadatas=update_metadatas)
+            migrated += len(update_ids)
+            for user_id in user_ids:
+                CONTENT_VERSIONS.bump(user_id)
+                if hot_index is not None:
+                    hot_index.invalidate(user_id)
+        offset += len(ids)
+    return migrated
+
+
+def _add_timestamp(metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if "timestamp" in metadata:
+        return None
+    timestamp = timestamp_from_iso(metadata.get("time"))
+    if timestamp is None:
+        return None
+    return {**metadata, "timestamp": timestamp}
+
+
+def _add_topic_label(metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if "topic" in metadata:
+        return None
+    return {**metadata, "topic": TOPIC_UNASSIGNED}
+
+
+def migrate_timestamps(collection, hot_index=None, stopping: Optional[threading.Event] = None) -> int:
+    """
+    Add the numeric "timestamp" metadata field (epoch seconds) to rows that
+    only have the ISO "time" string, so time range filters can match them.
+
+    Safe to run repeatedly: rows that already have a timestamp are skipped.
+    Hot-tier matrices of migrated users are dropped, since they were loaded
+    with timestamp 0 and would otherwise keep missing time-filtered searches.
+
+    Args:
+        collection: ChromaDB collection instance
+        hot_index: Optional HotVectorIndex to invalidate for migrated users
+        stopping: Optional event that ends the pass early
+
+    Returns:
+        Number of rows migrated
+    """
+    migrated = _migrate_metadata(collection, _add_timestamp, hot_index, stopping)
+    if migrated:
+        print(f"✅ Added numeric timestamps to {migrated} conversations")
+    return migrated
+
+
+def migrate_topic_labels(collection, stopping: Optional[threading.Event] = None) -> int:
+    """
+    Mark rows stored before topic clustering existed as TOPIC_UNASSIGNED,
+    so the background clustering job finds them.
+
+    Safe to run repeatedly: rows that already have a topic are skipped.
+
+    Args:
+        collection: ChromaDB collection instance
+        stopping: Optional event that ends the pass early
+
+    Returns:
+        Number of rows migrated
+    """
+    migrated = _migrate_metadata(collection, _add_topic_label, stopping=stopping)
+    if migrated:
+        print(f"✅ Queued {migrated} conversations for topic clustering")
+    return migrated
+
+
+def run_migrations(
+    collection,
+    hot_index=None,
+    stopping: Optional[threading.Event] = None
+) -> Dict[str, int]:
+    """Run every startup migration in order (blocking; run it in a worker thread)"""
+    return {
+        "timestamps": migrate_timestamps(collection, hot_index, stopping),
+        "topic_labels": migrate_topic_labels(collection, stopping)
+    }
+
+
+class MigrationJob:
+    """
+    Runs the startup migrations once in the background.
+
+    Failures are logged and kept in stats like the other jobs' last_error.
+    stop() asks the worker thread to finish its current batch but doesn't
+    wait for it, so shutdown isn't held up by a long migration; every
+    migration is idempotent and resumes on the next start.
+    """
+
+    def __init__(self, collection, hot_index=None):
+        self.collection = collection
+        self.hot_index = hot_index
+        self.task = None
+        self.stopping = threading.Event()
+        self.stats = {
+            "state": "pending",
+            "migrated": {},
+            "last_run": None,
+            "last_error": None
+        }
+
+    async def run_once(self) -> Dict[str, int]:
+        """Run the migrations, recording the outcome instead of raising"""
+        self.stats["state"] = "running"
+        try:
+            self.stats["migrated"] = await asyncio.to_thread(
+                run_migrations, self.collection, self.hot_index, self.stopping
+            )
+            self.stats["state"] = "stopped" if self.stopping.is_set() else "done"
+            self.stats["last_error"] = None
+        except Exception as e:
+            print(f"Error migrating conversations: {e}")
+            self.stats["state"] = "failed"
+            self.stats["last_error"] = str(e)
+        self.stats["last_run"] = datetime.now().isoformat()
+        return self.stats["migrated"]
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run_once())
+
+    async def stop(self):
+        if self.task is not None:
+            self.stopping.set()
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                self.stats["state"] = "stopped"
+            self.task = None
@@ -0,0 +1,191 @@
+# backend/src/profiling.py
+"""
+On-demand CPU sampling profiles and tracemalloc allocation diffs for production debugging
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from fastapi import HTTPException
+
+from constants import (
+    PROFILE_SAMPLE_INTERVAL,
+    PROFILE_MAX_SECONDS,
+    TRACEMALLOC_MAX_FRAMES,
+    MEMORY_DIFF_MAX_ENTRIES
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # Semicolons separate frames in the folded format
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler that samples every thread's Python stack at a fixed interval.
+
+    Nothing is installed in the interpreter (no sys.setprofile hooks): a
+    sampler thread reads sys._current_frames() only while a profile is being
+    taken, so the worker runs at full speed the rest of the time. Output is
+    the folded-stack format read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+
+    def profile(self, seconds: float) -> Dict[str, Any]:
+        """
+        Sample all threads for the given duration (blocking; run it in a worker thread).
+
+        Args:
+            seconds: Profile duration, capped at PROFILE_MAX_SECONDS
+
+        Returns:
+            Dictionary with folded stacks text, sample count and duration
+
+        Raises:
+            HTTPException: If a profile is already running or the duration is invalid
+        """
+        if seconds <= 0:
+            raise HTTPException(status_code=400, detail="seconds must be positive")
+        seconds = min(seconds, PROFILE_MAX_SECONDS)
+        if not self.lock.acquire(blocking=False):
+            raise HTTPException(status_code=409, detail="A profile is already running")
+
+        try:
+            me = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + seconds
+            while time.perf_counter() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(_frame_label(frame))
+                        frame = frame.f_back
+                    labels.append(names.get(ident, f"thread-{ident}"))
+                    stacks[";".join(reversed(labels))] += 1
+                samples += 1
+                time.sleep(self.interval)
+        finally:
+            self.lock.release()
+
+        folded = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        return {
+            "folded": folded + "\n",
+            "samples": samples,
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+
+
+class AllocationTracker:
+    """
+    tracemalloc wrapper for diffing heap snapshots taken at two points in time.
+
+    tracemalloc slows allocations down while it is tracing, so it is only
+    started on request and should be stopped once the diff is taken.
+    """
+
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_time: Optional[str] = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ))
+
+    def start(self, frames: int = 1) -> Dict[str, Any]:
+        """Start tracing allocations, keeping up to `frames` frames per traceback"""
+        frames = max(1, min(frames, TRACEMALLOC_MAX_FRAMES))
+        with self.lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            tracemalloc.start(frames)
+            self.baseline = self._take_snapshot()
+            self.baseline_time = datetime.now().isoformat()
+        return self.status()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Replace the baseline with a snapshot of the current heap"""
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                raise HTTPException(status_code=409, detail="Allocation tracking is not running")
+            self.baseline = self._take_snapshot()
+            self.baseline_time = datetime.now().isoformat()
+        return self.status()
+
+    def diff(self, limit: int = MEMORY_DIFF_MAX_ENTRIES, group_by: str = "lineno") -> Dict[str, Any]:
+        """
+        Compare the current heap against the baseline snapshot.
+
+        Args:
+            limit: Maximum number of entries to return
+            group_by: "lineno", "filename" or "traceback"
+
+        Returns:
+            Dictionary with the largest size changes since the baseline
+        """
+        if group_by not in ("lineno", "filename", "traceback"):
+            raise HTTPException(status_code=400, detail="group_by must be 'lineno', 'filename' or 'traceback'")
+        limit = max(1, min(limit, MEMORY_DIFF_MAX_ENTRIES))
+
+        with self.lock:
+            if not tracemalloc.is_tracing() or self.baseline is None:
+                raise HTTPException(status_code=409, detail="Allocation tracking is not running")
+            current = self._take_snapshot()
+            stats = current.compare_to(self.baseline, group_by)
+
+        return {
+            "since": self.baseline_time,
+            "size_diff_bytes": sum(s.size_diff for s in stats),
+            "top": [
+                {
+                    "traceback": [f"{frame.filename}:{frame.lineno}" for frame in s.traceback],
+                    "size_diff_bytes": s.size_diff,
+                    "size_bytes": s.size,
+                    "count_diff": s.count_diff,
+                    "count": s.count
+                }
+                for s in stats[:limit]
+            ]
+        }
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop tracing and drop the baseline"""
+        with self.lock:
+            tracemalloc.stop()
+            self.baseline = None
+            self.baseline_time = None
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        """Report whether tracing is on and how much memory it sees"""
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "baseline_time": self.baseline_time,
+            "traced_bytes": current,
+            "peak_traced_bytes": peak
+        }
@@ -0,0 +1,464 @@
+# backend/src/retention.py
+"""
+Retention policies and background compaction of old conversations into summary records
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from fastapi import HTTPException
+
+from constants import (
+    CONTEXT_GENERATION_PROMPT,
+    RETENTION_POLICY_FILE,
+    RETENTION_INTERVAL_SECONDS,
+    RETENTION_POLICY_FIELDS,
+    COMPACTION_BATCH_SIZE,
+    COMPACTION_MIN_BATCH_SIZE,
+    COMPACTION_MAX_TITLES,
+    COMPACTION_BATCH_PAUSE,
+    COMPACTION_SUMMARY_LENGTH,
+    PREFILTER_PROMPT_BUDGET,
+    SUMMARY_RECORD_KIND,
+    TOPIC_UNASSIGNED
+)
+from utils.etags import CONTENT_VERSIONS
+from utils.filters import timestamp_from_iso
+from utils.gemini import generate_context_with_gemini
+from utils.summarizer import summarize_conversations
+
+
+def load_retention_policies(path: str = RETENTION_POLICY_FILE) -> Dict[str, Any]:
+    """
+    Load retention policies from disk.
+
+    Policies are stored as {"default": {...}, "sources": {source: {...}}, "users": {user_id: {...}}},
+    where each policy may set max_age_days, max_count and max_bytes. A field
+    left out inherits from the broader policy; a field set to None switches
+    an inherited limit off.
+    """
+    policies = {"default": {}, "sources": {}, "users": {}}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            policies.update(json.load(f))
+    return policies
+
+
+def save_retention_policies(policies: Dict[str, Any], path: str = RETENTION_POLICY_FILE):
+    """Persist retention policies to disk atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(policies, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def resolve_policy(policies: Dict[str, Any], user_id: str, source: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve the effective policy for a user's conversations, optionally from one source.
+
+    Fields are merged default <- source <- user, so the most specific setting
+    wins. Fields missing from a layer are inherited; None disables the limit.
+    """
+    effective = {field: None for field in RETENTION_POLICY_FIELDS}
+    for layer in (
+        policies.get("default") or {},
+        (policies.get("sources") or {}).get(source) or {},
+        (policies.get("users") or {}).get(user_id) or {}
+    ):
+        for field in RETENTION_POLICY_FIELDS:
+            if field in layer:
+                effective[field] = layer[field]
+    return effective
+
+
+def _parse_time(value: Optional[str]) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.min
+
+
+def select_expired(
+    conversations: List[Dict[str, Any]],
+    policy: Dict[str, Any],
+    now: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Pick the conversations a policy says should be compacted.
+
+    Args:
+        conversations: Dicts with "id", "time" and "size" keys
+        policy: Effective policy (max_age_days, max_count, max_bytes)
+        now: Reference time for age checks
+
+    Returns:
+        Expired conversations, oldest first
+    """
+    ordered = sorted(conversations, key=lambda c: _parse_time(c["time"]), reverse=True)
+    expired = set()
+
+    if policy.get("max_age_days") is not None:
+        cutoff = now - timedelta(days=policy["max_age_days"])
+        expired.update(c["id"] for c in ordered if _parse_time(c["time"]) < cutoff)
+
+    if policy.get("max_count") is not None:
+        expired.update(c["id"] for c in ordered[policy["max_count"]:])
+
+    if policy.get("max_bytes") is not None:
+        total = 0
+        for c in ordered:
+            total += c["size"]
+            if total > policy["max_bytes"]:
+                expired.add(c["id"])
+
+    return [c for c in reversed(ordered) if c["id"] in expired]
+
+
+def select_user_expired(
+    rows: List[Dict[str, Any]],
+    policies: Dict[str, Any],
+    user_id: str,
+    now: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Pick the rows of one user that retention policies say should be compacted.
+
+    max_count and max_bytes from the default and user policies cap the user's
+    whole history across sources. Each source's effective policy (default <-
+    source <- user) also caps that source's rows and sets their maximum age.
+    Summary records count toward the limits like any other row.
+
+    Args:
+        rows: Dicts with "id", "time", "size" and "source" keys
+        policies: Retention policies (see load_retention_policies)
+        user_id: The user ID
+        now: Reference time for age checks
+
+    Returns:
+        Expired rows, oldest first
+    """
+    user_policy = resolve_policy(policies, user_id)
+    expired = {
+        c["id"] for c in select_expired(
+            rows, {"max_count": user_policy["max_count"], "max_bytes": user_policy["max_bytes"]}, now
+        )
+    }
+
+    by_source: Dict[str, List[Dict[str, Any]]] = {}
+    for c in rows:
+        by_source.setdefault(c["source"], []).append(c)
+    for source, source_rows in by_source.items():
+        policy = resolve_policy(policies, user_id, source)
+        expired.update(c["id"] for c in select_expired(source_rows, policy, now))
+
+    return sorted((c for c in rows if c["id"] in expired), key=lambda c: _parse_time(c["time"]))
+
+
+def _summarize_batch(documents: List[str], metadatas: List[Dict[str, Any]]) -> str:
+    """
+    Summarize a batch of conversations, falling back to a local extractive summary.
+
+    The batch is shrunk extractively before it is sent, and the call goes
+    through the "compact" breaker so compaction never trips "generate".
+    """
+    prompt = CONTEXT_GENERATION_PROMPT.format(
+        max_length=COMPACTION_SUMMARY_LENGTH,
+        conversation_text=summarize_conversations(documents, metadatas, PREFILTER_PROMPT_BUDGET)
+    )
+    summary, success = generate_context_with_gemini(prompt, COMPACTION_SUMMARY_LENGTH, operation="compact")
+    if success and summary:
+        return summary[:COMPACTION_SUMMARY_LENGTH]
+
+    return summarize_conversations(documents, metadatas, COMPACTION_SUMMARY_LENGTH)
+
+
+def _embed_summary(gemini_ef, summary: str):
+    """Embed a summary; during an outage store a placeholder for the backfill job"""
+    try:
+        return gemini_ef([summary])[0], False
+    except Exception as e:
+        print(f"Embedding unavailable, summary queued for backfill: {e}")
+        return [0.0] * gemini_ef.dimensions, True
+
+
+def _compact_batch(
+    collection,
+    gemini_ef,
+    user_id: str,
+    source: str,
+    ids: List[str]
+) -> Dict[str, Any]:
+    """
+    Merge one batch of rows into a new summary record and delete the originals.
+
+    The batch may include older summary records, which are folded in with
+    their titles and counts. The summary is embedded from its own text, so
+    searches match what it now says rather than an average of vectors.
+    """
+    results = collection.get(ids=ids, include=["documents", "metadatas"])
+    documents = results.get("documents") or []
+    metadatas = results.get("metadatas") or []
+    if not documents:
+        return {"id": None, "compacted": 0, "summaries_merged": 0, "bytes_reclaimed": 0}
+
+    order = sorted(range(len(documents)), key=lambda i: _parse_time(metadatas[i].get("time")))
+    documents = [documents[i] for i in order]
+    metadatas = [metadatas[i] for i in order]
+
+    titles, starts = [], []
+    compacted = merged = total = 0
+    for md in metadatas:
+        if md.get("kind") == SUMMARY_RECORD_KIND:
+            titles.extend(json.loads(md.get("titles") or "[]"))
+            starts.append(md.get("time_start") or md.get("time") or "")
+            total += md.get("compacted_count") or 0
+            merged += 1
+        else:
+            titles.append(md.get("title", "Untitled"))
+            starts.append(md.get("time") or "")
+            total += 1
+            compacted += 1
+
+    summary = _summarize_batch(documents, metadatas)
+    embedding, embedding_pending = _embed_summary(gemini_ef, summary)
+    latest = max(md.get("time") or "" for md in metadatas)
+    titles_json = json.dumps(titles[-COMPACTION_MAX_TITLES:])
+
+    metadata = {
+        "user_id": user_id,
+        "source": source,
+        "kind": SUMMARY_RECORD_KIND,
+        "time": latest,
+        "time_start": min(starts),
+        "timestamp": timestamp_from_iso(latest) or 0,
+        "title": f"Summary of {total} conversations from {source}",
+        "titles": titles_json,
+        "compacted_count": total,
+        "topic": TOPIC_UNASSIGNED
+    }
+    if embedding_pending:
+        metadata["embedding_pending"] = True
+
+    # Write the summary before deleting, so a failure never loses data
+    summary_id = str(uuid.uuid4())
+    collection.add(
+        ids=[summary_id],
+        documents=[summary],
+        metadatas=[metadata],
+        embeddings=[embedding]
+    )
+    collection.delete(ids=results["ids"])
+
+    original_bytes = sum(_row_size(doc, md) for doc, md in zip(documents, metadatas))
+    return {
+        "id": summary_id,
+        "compacted": compacted,
+        "summaries_merged": merged,
+        "bytes_reclaimed": max(original_bytes - _row_size(summary, metadata), 0)
+    }
+
+
+def _row_size(document: str, metadata: Dict[str, Any]) -> int:
+    """Bytes a row counts toward max_bytes: its document plus any kept titles"""
+    return len(document.encode("utf-8")) + len((metadata.get("titles") or "").encode("utf-8"))
+
+
+async def compact_user(user_id: str, collection, gemini_ef, policies: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Apply retention policies to one user's conversations.
+
+    Expired rows of each source are merged oldest first in batches of
+    COMPACTION_BATCH_SIZE, each batch carrying the previous batch's summary
+    forward, so a pass leaves one summary per source. A source is held back
+    until COMPACTION_MIN_BATCH_SIZE of its conversations have expired, which
+    keeps the row count near the limit instead of adding a tiny summary per
+    pass. The event loop is released between batches, so request handling is
+    never blocked.
+
+    Args:
+        user_id: The user ID to compact
+        collection: ChromaDB collection instance
+        gemini_ef: Embedding function for the new summary records
+        policies: Retention policies (see load_retention_policies)
+
+    Returns:
+        Dictionary with compacted, summaries, summaries_merged and bytes_reclaimed counts
+    """
+    stats = {"compacted": 0, "summaries": 0, "summaries_merged": 0, "bytes_reclaimed": 0}
+
+    results = await asyncio.to_thread(
+        collection.get, where={"user_id": user_id}, include=["documents", "metadatas"]
+    )
+    rows = [
+        {
+            "id": id_,
+            "source": md.get("source", "unknown"),
+            "time": md.get("time"),
+            "size": _row_size(doc, md),
+            "summary": md.get("kind") == SUMMARY_RECORD_KIND
+        }
+        for id_, doc, md in zip(results.get("ids") or [], results.get("documents") or [], results.get("metadatas") or [])
+        # Rows awaiting an embedding backfill only hold a placeholder vector
+        if not md.get("embedding_pending")
+    ]
+
+    expired_by_source: Dict[str, List[Dict[str, Any]]] = {}
+    for c in select_user_expired(rows, policies, user_id, datetime.now()):
+        expired_by_source.setdefault(c["source"], []).append(c)
+
+    for source, expired in expired_by_source.items():
+        if sum(1 for c in expired if not c["summary"]) < COMPACTION_MIN_BATCH_SIZE:
+            continue
+
+        ids = [c["id"] for c in expired]
+        carried = None
+        while ids:
+            take = COMPACTION_BATCH_SIZE - (carried is not None)
+            batch, ids = ([carried] if carried else []) + ids[:take], ids[take:]
+            batch_stats = await asyncio.to_thread(_compact_batch, collection, gemini_ef, user_id, source, batch)
+            if batch_stats["id"] is None:
+                break
+            stats["compacted"] += batch_stats["compacted"]
+            stats["bytes_reclaimed"] += batch_stats["bytes_reclaimed"]
+            # The carried summary from this pass is not an older one being merged
+            stats["summaries_merged"] += batch_stats["summaries_merged"] - (carried is not None)
+            carried = batch_stats["id"]
+            await asyncio.sleep(COMPACTION_BATCH_PAUSE)
+        if carried:
+            stats["summaries"] += 1
+
+    if stats["compacted"]:
+        print(f"✅ Compacted {stats['compacted']} conversations for user {user_id}, "
+              f"reclaimed {stats['bytes_reclaimed']} bytes")
+    return stats
+
+
+def _list_user_ids(collection) -> List[str]:
+    """Collect distinct user IDs by paging through metadata only"""
+    user_ids = set()
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=COMPACTION_BATCH_SIZE * 50, offset=offset)
+        metadatas = page.get("metadatas") or []
+        if not metadatas:
+            break
+        user_ids.update(md.get("user_id") for md in metadatas if md.get("user_id"))
+        offset += len(metadatas)
+    return sorted(user_ids)
+
+
+class CompactionJob:
+    """Background job that periodically applies retention policies to every user"""
+
+    def __init__(self, collection, gemini_ef, hot_index=None, interval: int = RETENTION_INTERVAL_SECONDS):
+        self.collection = collection
+        self.gemini_ef = gemini_ef
+        self.hot_index = hot_index
+        self.interval = interval
+        self.task = None
+        self.lock = asyncio.Lock()
+        self.stats = {
+            "runs": 0,
+            "compacted": 0,
+            "summaries": 0,
+            "summaries_merged": 0,
+            "bytes_reclaimed": 0,
+            "last_run": None,
+            "last_error": None
+        }
+
+    async def run_once(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run one compaction pass over all users (or a single user).
+
+        Returns:
+            Dictionary with the counts reclaimed by this pass
+        """
+        async with self.lock:
+            policies = load_retention_policies()
+            if user_id:
+                user_ids = [user_id.strip()]
+            else:
+                user_ids = await asyncio.to_thread(_list_user_ids, self.collection)
+
+            totals = {"users": len(user_ids), "compacted": 0, "summaries": 0, "summaries_merged": 0, "bytes_reclaimed": 0}
+            for uid in user_ids:
+                user_stats = await compact_user(uid, self.collection, self.gemini_ef, policies)
+                if user_stats["summaries"]:
+                    CONTENT_VERSIONS.bump(uid)
+                    if self.hot_index is not None:
+                        self.hot_index.invalidate(uid)
+                for key in ("compacted", "summaries", "summaries_merged", "bytes_reclaimed"):
+                    totals[key] += user_stats[key]
+
+            self.stats["runs"] += 1
+            for key in ("compacted", "summaries", "summaries_merged", "bytes_reclaimed"):
+                self.stats[key] += totals[key]
+            self.stats["last_run"] = datetime.now().isoformat()
+            return totals
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+                self.stats["last_error"] = None
+            except Exception as e:
+                print(f"Error running compaction: {e}")
+                self.stats["last_error"] = str(e)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+def update_retention_policy(
+    policy: Dict[str, Any],
+    user_id: Optional[str] = None,
+    source: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Set the retention policy for a user, a source, or the global default.
+
+    Args:
+        policy: Dict with any of max_age_days, max_count and max_bytes; fields
+            left out inherit from the broader policy, None disables a limit
+        user_id: Apply to this user
+        source: Apply to this source
+
+    Returns:
+        Dictionary with success status and the full policy set
+
+    Raises:
+        HTTPException: If both user_id and source are given or saving fails
+    """
+    if user_id and source:
+        raise HTTPException(status_code=400, detail="Set a policy for either a user or a source, not both")
+
+    try:
+        policies = load_retention_policies()
+        if user_id:
+            policies["users"][user_id.strip()] = policy
+        elif source:
+            policies["sources"][source.strip()] = policy
+        else:
+            policies["default"] = policy
+        save_retention_policies(policies)
+    except Exception as e:
+        print(f"Error saving retention policy: {e}")
+        raise HTTPException(status_code=500, detail=f"Error saving retention policy: {str(e)}")
+
+    return {"ok": True, "policies": policies}
@@ -0,0 +1,174 @@
+# backend/src/search.py
+"""
+Semantic search over a user's stored conversations
+"""
+
+from fastapi import HTTPException
+from typing import Dict, Any
+
+import numpy as np
+
+from constants import (
+    MAX_USER_ID_LENGTH,
+    MAX_SEARCH_LIMIT,
+    RERANK_OVERSAMPLE
+)
+from utils.circuit_breaker import CircuitOpenError
+from utils.embeddings import exact_top_k
+from utils.filters import build_where
+
+
+async def search_conversations(
+    user_id: str,
+    query: str,
+    limit: int,
+    collection,
+    gemini_ef,
+    rerank: bool | None = None,
+    hot_index=None,
+    filters: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    """
+    Find the stored conversations most similar to a query.
+
+    With a hot index, the user's embeddings are scored exactly in memory and
+    Chroma is only asked for the winning documents by id. Otherwise Chroma's
+    approximate search finds the candidates. When re-ranking, either tier
+    fetches extra candidates which are then re-scored exactly against
+    Chroma's float32 vectors, which recovers what the hot tier's reduced
+    precision loses.
+
+    Args:
+        user_id: The user ID to search within
+        query: Free-text search query
+        limit: Maximum number of results
+        collection: ChromaDB collection instance
+        gemini_ef: Gemini embedding function
+        rerank: Re-rank candidates exactly (defaults to the embedding profile setting)
+        hot_index: Optional HotVectorIndex for exact in-memory search
+        filters: Optional since/until/source filters (see utils.filters.parse_filters)
+
+    Returns:
+        Dictionary with scored items list and count
+
+    Raises:
+        HTTPException: If validation fails or search error occurs
+    """
+    try:
+        if not user_id or not user_id.strip():
+            raise HTTPException(status_code=400, detail="user_id is required")
+
+        if len(user_id) > MAX_USER_ID_LENGTH:
+            raise HTTPException(status_code=400, detail=f"user_id too long (max {MAX_USER_ID_LENGTH} characters)")
+
+        if not query or not query.strip():
+            raise HTTPException(status_code=400, detail="query is required")
+
+        user_id = user_id.strip()
+        limit = max(1, min(limit or 10, MAX_SEARCH_LIMIT))
+        if rerank is None:
+            rerank = gemini_ef.profile["rerank"]
+
+        try:
+            query_embedding = gemini_ef.embed_query(query.strip())
+        except CircuitOpenError:
+            raise HTTPException(status_code=503, detail="Search temporarily unavailable: embedding service is down")
+        if hot_index is not None:
+            return _search_hot_index(user_id, query_embedding, limit, collection, hot_index, filters, rerank)
+
+        n_results = limit * RERANK_OVERSAMPLE if rerank else limit
+        include = ["documents", "metadatas", "distances"]
+        if rerank:
+            include.append("embeddings")
+
+        try:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=build_where(user_id, filters),
+                include=include
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error querying conversations: {str(e)}")
+
+        ids = results["ids"][0]
+        documents = results["documents"][0]
+        metadatas = results["metadatas"][0]
+
+        if rerank:
+            order, scores = exact_top_k(
+                np.asarray(query_embedding, dtype=np.float32),
+                np.asarray(results["embeddings"][0], dtype=np.float32),
+                limit
+            )
+        else:
+            # Chroma's default space is squared L2, which maps to cosine on unit vectors
+            distances = np.asarray(results["distances"][0], dtype=np.float32)
+            order = np.arange(len(ids))[:limit]
+            scores = 1.0 - distances[order] / 2.0
+
+        # Conversations awaiting an embedding backfill only have a placeholder vector
+        items = [
+            {"id": ids[i], "text": documents[i], "metadata": metadatas[i], "score": float(score)}
+            for i, score in zip(order.tolist(), scores.tolist())
+            if not metadatas[i].get("embedding_pending")
+        ]
+
+        return {"items": items, "count": len(items), "reranked": rerank, "tier": "chroma"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching conversations: {str(e)}")
+
+
+def _search_hot_index(
+    user_id: str,
+    query_embedding,
+    limit: int,
+    collection,
+    hot_index,
+    filters: Dict[str, Any] | None = None,
+    rerank: bool = False
+) -> Dict[str, Any]:
+    """Exact search over the user's in-memory matrix, then fetch documents by id"""
+    k = limit * RERANK_OVERSAMPLE if rerank else limit
+    top_ids, scores = hot_index.search(user_id, query_embedding, k, filters)
+    if not top_ids:
+        return {"items": [], "count": 0, "reranked": rerank, "tier": "hot"}
+
+    include = ["documents", "metadatas"]
+    if rerank:
+        include.append("embeddings")
+    try:
+        results = collection.get(ids=top_ids, include=include)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving conversations: {str(e)}")
+
+    if rerank:
+        order, exact_scores = exact_top_k(
+            np.asarray(query_embedding, dtype=np.float32),
+            np.asarray(results["embeddings"], dtype=np.float32),
+            limit
+        )
+        items = [
+            {
+                "id": results["ids"][i],
+                "text": results["documents"][i],
+                "metadata": results["metadatas"][i],
+                "score": float(score)
+            }
+            for i, score in zip(order.tolist(), exact_scores.tolist())
+        ]
+        return {"items": items, "count": len(items), "reranked": True, "tier": "hot"}
+
+    found = {
+        id_: (doc, md)
+        for id_, doc, md in zip(results["ids"], results["documents"], results["metadatas"])
+    }
+    items = [
+        {"id": id_, "text": found[id_][0], "metadata": found[id_][1], "score": float(score)}
+        for id_, score in zip(top_ids, scores.tolist())
+        if id_ in found
+    ]
+    return {"items": items, "count": len(items), "reranked": False, "tier": "hot"}
@@ -0,0 +1,290 @@
+# backend/src/snapshot.py
+"""
+Snapshot export/import of conversation data as Parquet (ids, documents, metadata, embeddings)
+"""
+
+import asyncio
+import json
+import tempfile
+from typing import Dict, Any, Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from fastapi import HTTPException
+
+from constants import (
+    MAX_USER_ID_LENGTH,
+    SNAPSHOT_BATCH_SIZE,
+    SNAPSHOT_UPSERT_BATCH_SIZE,
+    SNAPSHOT_PARQUET_COMPRESSION,
+    TOPIC_UNASSIGNED
+)
+from utils.embeddings import quantize_embeddings, dequantize_embeddings
+from utils.etags import CONTENT_VERSIONS
+from utils.filters import timestamp_from_iso
+
+
+SNAPSHOT_COLUMNS = ("id", "user_id", "document", "metadata", "embedding")
+
+# Arrow value type for each embedding storage dtype
+EMBEDDING_ARROW_TYPES = {
+    "float32": pa.float32(),
+    "float16": pa.float16(),
+    "int8": pa.int8()
+}
+
+
+class _ChunkSink:
+    """Write-only file object that buffers bytes until drained"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _validate_user_id(user_id: Optional[str]) -> Optional[str]:
+    if user_id is None:
+        return None
+    if not user_id.strip():
+        raise HTTPException(status_code=400, detail="user_id cannot be empty")
+    if len(user_id) > MAX_USER_ID_LENGTH:
+        raise HTTPException(status_code=400, detail=f"user_id too long (max {MAX_USER_ID_LENGTH} characters)")
+    return user_id.strip()
+
+
+def _with_defaults(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the numeric timestamp and topic label to rows exported before they existed"""
+    metadata.setdefault("topic", TOPIC_UNASSIGNED)
+    if "timestamp" not in metadata:
+        timestamp = timestamp_from_iso(metadata.get("time"))
+        if timestamp is not None:
+            metadata["timestamp"] = timestamp
+    return metadata
+
+
+def _results_to_batch(results: Dict[str, Any], dtype: str) -> pa.RecordBatch:
+    """Convert a Chroma get() page into an Arrow record batch"""
+    ids = results.get("ids") or []
+    documents = results.get("documents") or []
+    metadatas = results.get("metadatas") or []
+    embeddings = np.asarray(results.get("embeddings"), dtype=np.float32)
+    dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+    codes, scales = quantize_embeddings(embeddings.reshape(len(ids), dim), dtype)
+
+    embedding_array = pa.FixedSizeListArray.from_arrays(
+        pa.array(codes.ravel(), type=EMBEDDING_ARROW_TYPES[dtype]),
+        dim
+    )
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(ids, type=pa.string()),
+            pa.array([(md or {}).get("user_id") for md in metadatas], type=pa.string()),
+            pa.array(documents, type=pa.string()),
+            pa.array([json.dumps(md or {}) for md in metadatas], type=pa.string()),
+            embedding_array,
+            pa.array(scales, type=pa.float32())
+        ],
+        names=list(SNAPSHOT_COLUMNS) + ["embedding_scale"]
+    )
+
+
+def export_snapshot(
+    collection,
+    user_id: Optional[str] = None,
+    dtype: str = "float32"
+) -> Iterator[bytes]:
+    """
+    Stream a Parquet snapshot of the collection (or of one user's data).
+
+    Rows are read from Chroma page by page and written as one row group per
+    page, so memory use stays flat regardless of collection size.
+
+    Args:
+        collection: ChromaDB collection instance
+        user_id: Optional user ID to restrict the export to
+        dtype: Storage dtype for the embedding column ("float32", "float16" or "int8")
+
+    Returns:
+        Iterator over chunks of the Parquet file
+
+    Raises:
+        HTTPException: If user_id is invalid (raised before streaming starts)
+    """
+    user_id = _validate_user_id(user_id)
+    if dtype not in EMBEDDING_ARROW_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported embedding dtype '{dtype}'")
+    return _iter_snapshot_chunks(collection, user_id, dtype)
+
+
+def _iter_snapshot_chunks(collection, user_id: Optional[str], dtype: str) -> Iterator[bytes]:
+    where = {"user_id": user_id} if user_id else None
+
+    sink = _ChunkSink()
+    output = pa.PythonFile(sink, mode="w")
+    writer = None
+    offset = 0
+
+    while True:
+        results = collection.get(
+            where=where,
+            limit=SNAPSHOT_BATCH_SIZE,
+            offset=offset,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        if not results.get("ids"):
+            break
+
+        batch = _results_to_batch(results, dtype)
+        if writer is None:
+            writer = pq.ParquetWriter(output, batch.schema, compression=SNAPSHOT_PARQUET_COMPRESSION)
+        writer.write_batch(batch)
+        offset += batch.num_rows
+
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+        if batch.num_rows < SNAPSHOT_BATCH_SIZE:
+            break
+
+    if writer is None:
+        # Empty export - still produce a valid file with the snapshot schema
+        schema = pa.schema([
+            ("id", pa.string()),
+            ("user_id", pa.string()),
+            ("document", pa.string()),
+            ("metadata", pa.string()),
+            ("embedding", pa.list_(EMBEDDING_ARROW_TYPES[dtype])),
+            ("embedding_scale", pa.float32())
+        ])
+        writer = pq.ParquetWriter(output, schema, compression=SNAPSHOT_PARQUET_COMPRESSION)
+
+    writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+    print(f"✅ Exported snapshot of {offset} rows" + (f" for user {user_id}" if user_id else ""))
+
+
+def _upsert_batch(collection, batch: pa.RecordBatch, has_scale: bool):
+    """Decode one snapshot record batch and upsert it into the collection"""
+    embedding_column = batch.column("embedding")
+    codes = embedding_column.flatten().to_numpy(zero_copy_only=False).reshape(batch.num_rows, -1)
+    if has_scale:
+        scales = batch.column("embedding_scale").to_numpy(zero_copy_only=False)
+    else:
+        scales = np.ones(batch.num_rows, dtype=np.float32)
+
+    collection.upsert(
+        ids=batch.column("id").to_pylist(),
+        documents=batch.column("document").to_pylist(),
+        metadatas=[_with_defaults(json.loads(md)) for md in batch.column("metadata").to_pylist()],
+        embeddings=dequantize_embeddings(codes, scales)
+    )
+
+
+async def import_snapshot(
+    stream,
+    collection,
+    user_id: Optional[str] = None,
+    hot_index=None
+) -> Dict[str, Any]:
+    """
+    Import a Parquet snapshot into the collection using bulk upserts.
+
+    Stored embeddings are written as-is, so nothing is re-embedded.
+
+    Args:
+        stream: Async iterator of request body chunks
+        collection: ChromaDB collection instance
+        user_id: Optional user ID; when given, only that user's rows are imported
+        hot_index: Optional HotVectorIndex to invalidate after the import
+
+    Returns:
+        Dictionary with success status and imported row count
+
+    Raises:
+        HTTPException: If the snapshot is invalid or the import fails
+    """
+    user_id = _validate_user_id(user_id)
+
+    # Parquet needs a seekable file; spool the upload to disk past 16MB
+    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as spool:
+        async for chunk in stream:
+            spool.write(chunk)
+        spool.seek(0)
+
+        try:
+            parquet_file = pq.ParquetFile(spool)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid snapshot file: {str(e)}")
+
+        missing = set(SNAPSHOT_COLUMNS) - set(parquet_file.schema_arrow.names)
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Snapshot is missing columns: {', '.join(sorted(missing))}")
+
+        # Snapshots without a scale column hold plain float32 embeddings
+        columns = list(SNAPSHOT_COLUMNS)
+        has_scale = "embedding_scale" in parquet_file.schema_arrow.names
+        if has_scale:
+            columns.append("embedding_scale")
+
+        imported = 0
+        skipped = 0
+        try:
+            batches = parquet_file.iter_batches(batch_size=SNAPSHOT_BATCH_SIZE, columns=columns)
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                if user_id:
+                    mask = pc.equal(batch.column("user_id"), user_id)
+                    filtered = batch.filter(mask)
+                    skipped += batch.num_rows - filtered.num_rows
+                    batch = filtered
+                if batch.num_rows == 0:
+                    continue
+
+                # Upserts run in a worker thread, in slices small enough that the
+                # event loop gets the GIL back every few tens of milliseconds
+                for start in range(0, batch.num_rows, SNAPSHOT_UPSERT_BATCH_SIZE):
+                    rows = batch.slice(start, SNAPSHOT_UPSERT_BATCH_SIZE)
+                    await asyncio.to_thread(_upsert_batch, collection, rows, has_scale)
+                imported += batch.num_rows
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error importing snapshot: {e}")
+            raise HTTPException(status_code=500, detail=f"Error importing snapshot: {str(e)}")
+
+    if imported:
+        CONTENT_VERSIONS.bump(user_id)
+        if hot_index is not None:
+            hot_index.invalidate(user_id)
+    print(f"✅ Imported {imported} rows from snapshot")
+    return {
+        "ok": True,
+        "message": f"Imported {imported} conversations",
+        "imported_count": imported,
+        "skipped_count": skipped
+    }
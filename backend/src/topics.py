@@ -0,0 +1,315 @@
+# backend/src/topics.py
+"""
+Topic clustering of a user's conversations, cached as a "topic" label in metadata
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+
+from constants import (
+    MAX_USER_ID_LENGTH,
+    TOPIC_UNASSIGNED,
+    TOPIC_MIN_CONVERSATIONS,
+    TOPIC_RECLUSTER_FRACTION,
+    TOPIC_REPRESENTATIVES,
+    TOPIC_INTERVAL_SECONDS,
+    TOPIC_SCAN_PAGE_SIZE
+)
+from utils.clustering import (
+    assign,
+    centroids_from_labels,
+    choose_k,
+    kmeans,
+    representatives
+)
+from utils.etags import CONTENT_VERSIONS
+from utils.filters import build_where
+
+
+def _stored_label(metadata: Dict[str, Any]) -> int:
+    label = metadata.get("topic")
+    return label if isinstance(label, int) else TOPIC_UNASSIGNED
+
+
+def update_user_topics(user_id: str, collection) -> Dict[str, Any]:
+    """
+    Bring a user's cached topic labels up to date.
+
+    New conversations are stored with topic TOPIC_UNASSIGNED. While they are
+    a small share of the user's history they are assigned to the nearest
+    existing topic centroid; once they exceed TOPIC_RECLUSTER_FRACTION of the
+    clustered rows, the user is re-clustered with k-means, warm-started from
+    the current centroids when the topic count is unchanged. Only rows whose
+    label changed are written back.
+
+    Args:
+        user_id: The user ID
+        collection: ChromaDB collection instance
+
+    Returns:
+        Dictionary with the user's ids, documents, metadatas (with current
+        labels) and embeddings, plus "eligible" (rows with a real embedding)
+        and "updated" (rows relabelled)
+    """
+    results = collection.get(where={"user_id": user_id}, include=["documents", "metadatas", "embeddings"])
+    ids = results.get("ids") or []
+    documents = results.get("documents") or []
+    metadatas = [dict(md or {}) for md in results.get("metadatas") or []]
+    embeddings = results.get("embeddings")
+    state = {
+        "ids": ids,
+        "documents": documents,
+        "metadatas": metadatas,
+        "embeddings": embeddings,
+        "eligible": 0,
+        "updated": 0
+    }
+
+    # Rows awaiting an embedding backfill only hold a placeholder vector
+    eligible = [i for i, md in enumerate(metadatas) if not md.get("embedding_pending")]
+    state["eligible"] = len(eligible)
+    if len(eligible) < TOPIC_MIN_CONVERSATIONS:
+        return state
+
+    matrix = np.asarray(embeddings, dtype=np.float32)[eligible]
+    current = np.array([_stored_label(metadatas[i]) for i in eligible])
+    assigned = current != TOPIC_UNASSIGNED
+    stored_k = int(current.max()) + 1 if assigned.any() else 0
+    target_k = choose_k(len(eligible))
+
+    if not assigned.any() or (~assigned).sum() > TOPIC_RECLUSTER_FRACTION * assigned.sum():
+        initial = None
+        if stored_k == target_k:
+            initial = centroids_from_labels(matrix[assigned], current[assigned], stored_k)
+        _, labels = kmeans(matrix, target_k, initial)
+    else:
+        labels = current.copy()
+        centroids = centroids_from_labels(matrix[assigned], current[assigned], stored_k)
+        labels[~assigned] = assign(matrix[~assigned], centroids)
+
+    changed = [(eligible[j], int(label)) for j, label in enumerate(labels) if label != current[j]]
+    if changed:
+        for i, label in changed:
+            metadatas[i]["topic"] = label
+        collection.update(ids=[ids[i] for i, _ in changed], metadatas=[metadatas[i] for i, _ in changed])
+        CONTENT_VERSIONS.bump(user_id)
+    state["updated"] = len(changed)
+    return state
+
+
+def group_by_topic(
+    embeddings,
+    metadatas: List[Dict[str, Any]],
+    per_topic: int = TOPIC_REPRESENTATIVES
+) -> List[Tuple[int, List[int]]]:
+    """
+    Group rows by their cached topic label and pick each topic's representatives.
+
+    Unclustered rows (too few conversations, or awaiting an embedding) are
+    returned as single-row groups so nothing is silently dropped.
+
+    Returns:
+        List of (conversation count, representative row indices), largest topic first
+    """
+    labels = np.array([_stored_label(md) for md in metadatas])
+    clustered = np.flatnonzero(labels != TOPIC_UNASSIGNED)
+    groups = []
+    if len(clustered):
+        matrix = np.asarray(embeddings, dtype=np.float32)[clustered]
+        counts = Counter(labels[clustered].tolist())
+        for label, rows in representatives(matrix, labels[clustered], per_topic):
+            groups.append((counts[label], [int(clustered[r]) for r in rows]))
+    groups.extend((1, [int(i)]) for i in np.flatnonzero(labels == TOPIC_UNASSIGNED))
+    return groups
+
+
+def select_topic_representatives(
+    user_id: str,
+    collection,
+    filters: Optional[Dict[str, Any]] = None,
+    per_topic: int = TOPIC_REPRESENTATIVES
+) -> Dict[str, Any]:
+    """
+    Pick a few representative conversations per topic for context generation.
+
+    Only reads the cached labels; TopicClusteringJob keeps them current, so
+    this never changes stored data under an ETag computed for the request.
+
+    Args:
+        user_id: The user ID
+        collection: ChromaDB collection instance
+        filters: Optional since/until/source filters (see utils.filters.parse_filters)
+        per_topic: Representatives per topic
+
+    Returns:
+        Dictionary with "groups" (count, documents, metadatas per topic) and
+        "conversation_count" (all matching conversations)
+    """
+    state = collection.get(
+        where=build_where(user_id, filters),
+        include=["documents", "metadatas", "embeddings"]
+    )
+
+    documents = state.get("documents") or []
+    metadatas = state.get("metadatas") or []
+    if not documents:
+        return {"groups": [], "conversation_count": 0}
+
+    groups = [
+        (count, [documents[i] for i in rows], [metadatas[i] for i in rows])
+        for count, rows in group_by_topic(state["embeddings"], metadatas, per_topic)
+    ]
+    return {"groups": groups, "conversation_count": len(documents)}
+
+
+async def get_user_topics(user_id: str, collection) -> Dict[str, Any]:
+    """
+    List a user's topics with conversation counts and representatives.
+
+    Reads the labels cached by TopicClusteringJob; conversations it hasn't
+    reached yet are reported in unclustered_count.
+
+    Args:
+        user_id: The user ID
+        collection: ChromaDB collection instance
+
+    Returns:
+        Dictionary with topics list (largest first) and counts
+
+    Raises:
+        HTTPException: If validation fails or retrieval error occurs
+    """
+    if not user_id or not user_id.strip():
+        raise HTTPException(status_code=400, detail="user_id is required")
+    if len(user_id) > MAX_USER_ID_LENGTH:
+        raise HTTPException(status_code=400, detail=f"user_id too long (max {MAX_USER_ID_LENGTH} characters)")
+    user_id = user_id.strip()
+
+    try:
+        state = await asyncio.to_thread(
+            collection.get, where={"user_id": user_id}, include=["metadatas", "embeddings"]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving topics: {str(e)}")
+
+    ids = state.get("ids") or []
+    metadatas = state.get("metadatas") or []
+    labels = [_stored_label(md) for md in metadatas]
+    topics = []
+    if ids and any(label != TOPIC_UNASSIGNED for label in labels):
+        for count, rows in group_by_topic(state["embeddings"], metadatas):
+            if labels[rows[0]] == TOPIC_UNASSIGNED:
+                continue
+            members = [md for md, label in zip(metadatas, labels) if label == labels[rows[0]]]
+            topics.append({
+                "topic": labels[rows[0]],
+                "label": metadatas[rows[0]].get("title", "Untitled"),
+                "count": count,
+                "sources": dict(Counter(md.get("source", "unknown") for md in members)),
+                "latest_time": max((md.get("time") or "" for md in members), default=None),
+                "representative_ids": [ids[i] for i in rows]
+            })
+
+    return {
+        "topics": topics,
+        "topic_count": len(topics),
+        "conversation_count": len(ids),
+        "unclustered_count": sum(1 for label in labels if label == TOPIC_UNASSIGNED)
+    }
+
+
+def _unassigned_counts(collection) -> Dict[str, int]:
+    """Per user, how many embedded conversations are not yet assigned to a topic"""
+    counts: Counter = Counter()
+    offset = 0
+    while True:
+        page = collection.get(
+            where={"topic": TOPIC_UNASSIGNED},
+            include=["metadatas"],
+            limit=TOPIC_SCAN_PAGE_SIZE,
+            offset=offset
+        )
+        metadatas = page.get("metadatas") or []
+        if not metadatas:
+            break
+        counts.update(
+            md["user_id"] for md in metadatas
+            if md.get("user_id") and not md.get("embedding_pending")
+        )
+        offset += len(metadatas)
+    return dict(counts)
+
+
+class TopicClusteringJob:
+    """
+    Background job that keeps topic labels current as conversations arrive.
+
+    Users with too few conversations to cluster are remembered with their
+    unassigned count and skipped until it changes (a new conversation, a
+    backfilled embedding or a delete), so they aren't re-read every pass.
+    """
+
+    def __init__(self, collection, interval: int = TOPIC_INTERVAL_SECONDS):
+        self.collection = collection
+        self.interval = interval
+        self.task = None
+        self.too_small: Dict[str, int] = {}
+        self.stats = {
+            "runs": 0,
+            "relabelled": 0,
+            "users_too_small": 0,
+            "last_run": None,
+            "last_error": None
+        }
+
+    async def run_once(self) -> int:
+        """
+        Update topics for every user with unassigned conversations.
+
+        Returns:
+            Number of conversations relabelled in this pass
+        """
+        relabelled = 0
+        counts = await asyncio.to_thread(_unassigned_counts, self.collection)
+        self.too_small = {uid: n for uid, n in self.too_small.items() if counts.get(uid) == n}
+        for user_id in sorted(counts):
+            if user_id in self.too_small:
+                continue
+            state = await asyncio.to_thread(update_user_topics, user_id, self.collection)
+            relabelled += state["updated"]
+            if state["eligible"] < TOPIC_MIN_CONVERSATIONS:
+                self.too_small[user_id] = counts[user_id]
+
+        self.stats["runs"] += 1
+        self.stats["relabelled"] += relabelled
+        self.stats["users_too_small"] = len(self.too_small)
+        self.stats["last_run"] = datetime.now().isoformat()
+        return relabelled
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+                self.stats["last_error"] = None
+            except Exception as e:
+                print(f"Error clustering topics: {e}")
+                self.stats["last_error"] = str(e)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
@@ -0,0 +1,142 @@
+# backend/utils/circuit_breaker.py
+"""
+Circuit breaker for remote calls (Gemini) with fast-fail degraded mode
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+from constants import (
+    BREAKER_WINDOW_SIZE,
+    BREAKER_MIN_CALLS,
+    BREAKER_FAILURE_RATE,
+    BREAKER_SLOW_CALL_SECONDS,
+    BREAKER_OPEN_SECONDS
+)
+from utils.tracing import span
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Tracks the error rate and latency of an operation and fails fast while it is unhealthy.
+
+    closed:    calls go through; outcomes are recorded in a sliding window
+    open:      calls are rejected immediately for open_seconds
+    half_open: one probe call is let through; success closes, failure re-opens
+
+    Calls slower than slow_call_seconds count as failures, so a provider that
+    is hanging rather than erroring still trips the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = BREAKER_WINDOW_SIZE,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+
+        self.state = self.CLOSED
+        self.outcomes = deque(maxlen=window_size)  # (failed, latency) tuples
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed (claims the probe slot when half-open)"""
+        with self.lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record(self, failed: bool, latency: float):
+        """Record the outcome of a call and update the circuit state"""
+        failed = failed or latency > self.slow_call_seconds
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = self.CLOSED
+                    self.outcomes.clear()
+                return
+
+            self.outcomes.append((failed, latency))
+            if len(self.outcomes) >= self.min_calls:
+                failures = sum(1 for f, _ in self.outcomes if f)
+                if failures / len(self.outcomes) >= self.failure_rate:
+                    self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        print(f"⚠️ Circuit '{self.name}' opened, failing fast for {self.open_seconds}s")
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: Whatever fn raises (after recording the failure)
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        start = time.monotonic()
+        try:
+            with span(f"gemini.{self.name}"):
+                result = fn(*args, **kwargs)
+        except Exception:
+            self.record(True, time.monotonic() - start)
+            raise
+        self.record(False, time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Report the breaker state for /health"""
+        with self.lock:
+            outcomes = list(self.outcomes)
+            state = self.state
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(self.open_seconds - (time.monotonic() - self.opened_at), 0.0)
+
+        latencies = sorted(latency for _, latency in outcomes)
+        return {
+            "state": state,
+            "calls": len(outcomes),
+            "failure_rate": round(sum(1 for f, _ in outcomes if f) / len(outcomes), 3) if outcomes else 0.0,
+            "p50_latency_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            "slow_call_ms": round(self.slow_call_seconds * 1000),
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None
+        }
@@ -0,0 +1,136 @@
+# backend/utils/clustering.py
+"""
+Spherical k-means over conversation embeddings for topic grouping
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from constants import (
+    TOPIC_MIN_CLUSTERS,
+    TOPIC_MAX_CLUSTERS,
+    TOPIC_KMEANS_ITERATIONS
+)
+from utils.embeddings import normalize_embeddings
+
+
+def choose_k(n: int) -> int:
+    """
+    Number of topics for n conversations: sqrt(n), clamped.
+
+    Over-splitting a topic only costs a few extra representatives, while
+    merging a rare topic into a large one drops it from the context, so this
+    errs above the usual sqrt(n/2) rule of thumb.
+    """
+    k = int(round(np.sqrt(n)))
+    return max(min(k, TOPIC_MAX_CLUSTERS, n), min(TOPIC_MIN_CLUSTERS, n))
+
+
+def _kmeans_plus_plus(embeddings: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Spread initial centroids out by sampling proportional to cosine distance"""
+    centroids = [embeddings[rng.integers(len(embeddings))]]
+    distance = 1.0 - embeddings @ centroids[0]
+    for _ in range(1, k):
+        weights = np.clip(distance, 0.0, None)
+        total = weights.sum()
+        if total <= 0:
+            index = rng.integers(len(embeddings))
+        else:
+            index = rng.choice(len(embeddings), p=weights / total)
+        centroids.append(embeddings[index])
+        distance = np.minimum(distance, 1.0 - embeddings @ embeddings[index])
+    return np.stack(centroids)
+
+
+def kmeans(
+    embeddings: np.ndarray,
+    k: int,
+    initial: Optional[np.ndarray] = None,
+    iterations: int = TOPIC_KMEANS_ITERATIONS,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster embeddings by cosine similarity (spherical k-means).
+
+    Args:
+        embeddings: (n, dimensions) embedding matrix
+        k: Number of clusters
+        initial: Optional (k, dimensions) centroids to warm-start from
+        iterations: Maximum Lloyd iterations
+        seed: Seed for k-means++ initialization
+
+    Returns:
+        Tuple of (unit-length centroids, label per row)
+    """
+    embeddings = normalize_embeddings(np.asarray(embeddings, dtype=np.float32))
+    k = max(1, min(k, len(embeddings)))
+    rng = np.random.default_rng(seed)
+
+    if initial is not None and len(initial) == k:
+        centroids = normalize_embeddings(np.asarray(initial, dtype=np.float32))
+    else:
+        centroids = _kmeans_plus_plus(embeddings, k, rng)
+
+    labels = np.full(len(embeddings), -1)
+    for _ in range(iterations):
+        similarity = embeddings @ centroids.T
+        updated = np.argmax(similarity, axis=1)
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, embeddings)
+        counts = np.bincount(labels, minlength=k)
+        fit = similarity[np.arange(len(labels)), labels]
+        for empty in np.flatnonzero(counts == 0):
+            # Re-seed an empty cluster with the row its centroid fits worst
+            worst = int(np.argmin(fit))
+            fit[worst] = np.inf
+            sums[labels[worst]] -= embeddings[worst]
+            sums[empty] = embeddings[worst]
+            labels[worst] = empty
+        centroids = normalize_embeddings(sums)
+
+    return centroids, labels
+
+
+def centroids_from_labels(embeddings: np.ndarray, labels: np.ndarray, k: int) -> np.ndarray:
+    """Unit-length mean embedding of each label (zero rows for empty labels)"""
+    sums = np.zeros((k, embeddings.shape[1]), dtype=np.float32)
+    np.add.at(sums, labels, normalize_embeddings(np.asarray(embeddings, dtype=np.float32)))
+    return normalize_embeddings(sums)
+
+
+def assign(embeddings: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Label of the nearest centroid for each row"""
+    embeddings = normalize_embeddings(np.asarray(embeddings, dtype=np.float32))
+    return np.argmax(embeddings @ centroids.T, axis=1)
+
+
+def representatives(
+    embeddings: np.ndarray,
+    labels: np.ndarray,
+    per_topic: int
+) -> List[Tuple[int, List[int]]]:
+    """
+    Pick the rows closest to each topic's centroid.
+
+    Args:
+        embeddings: (n, dimensions) embedding matrix
+        labels: Topic label per row
+        per_topic: Maximum representatives per topic
+
+    Returns:
+        List of (label, row indices best first), largest topic first
+    """
+    embeddings = normalize_embeddings(np.asarray(embeddings, dtype=np.float32))
+    topics = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        centroid = normalize_embeddings(embeddings[members].mean(axis=0))
+        order = members[np.argsort(-(embeddings[members] @ centroid), kind="stable")]
+        topics.append((int(label), len(members), order[:per_topic].tolist()))
+    topics.sort(key=lambda t: -t[1])
+    return [(label, rows) for label, _, rows in topics]
@@ -0,0 +1,143 @@
+# backend/utils/compression.py
+"""
+Negotiated response compression (brotli/gzip) for SabkiSoch API
+"""
+
+import gzip
+
+import anyio
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+from constants import (
+    COMPRESSION_MINIMUM_SIZE,
+    GZIP_COMPRESSION_LEVEL,
+    BROTLI_COMPRESSION_QUALITY
+)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the best supported content encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+
+    Returns:
+        "br", "gzip" or None if the client accepts neither
+    """
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a response body with the given encoding.
+
+    Args:
+        body: Raw response body
+        encoding: "br" or "gzip"
+
+    Returns:
+        Compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_COMPRESSION_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_COMPRESSION_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses complete response bodies above a size threshold.
+
+    Streaming responses (sent in several chunks) and responses that already carry
+    a Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                if b"content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is None:
+                await send(message)
+                return
+
+            if more_body or len(body) < self.minimum_size:
+                # Streaming or small response - send as-is
+                await send(start_message)
+                start_message = None
+                passthrough = True
+                await send(message)
+                return
+
+            # Compress off the event loop so large bodies don't stall other requests
+            compressed = await anyio.to_thread.run_sync(compress_body, body, encoding)
+            headers = []
+            vary = b"Accept-Encoding"
+            for key, value in start_message.get("headers", []):
+                if key == b"content-length":
+                    continue
+                if key == b"vary":
+                    vary = value + b", Accept-Encoding"
+                    continue
+                headers.append((key, value))
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            headers.append((b"vary", vary))
+
+            await send({**start_message, "headers": headers})
+            start_message = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,91 @@
+# backend/utils/embeddings.py
+"""
+Embedding storage profiles, quantization and exact scoring helpers for SabkiSoch API
+"""
+
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+from constants import EMBEDDING_PROFILES
+
+
+def get_embedding_profile(name: str) -> Dict[str, Any]:
+    """
+    Look up an embedding storage profile by name.
+
+    Args:
+        name: Profile name (see EMBEDDING_PROFILES)
+
+    Returns:
+        Dictionary with "dimensions", "dtype" and "rerank" keys
+
+    Raises:
+        ValueError: If the profile is unknown or misconfigured
+    """
+    if name not in EMBEDDING_PROFILES:
+        raise ValueError(
+            f"Unknown embedding profile '{name}' (expected one of: {', '.join(EMBEDDING_PROFILES)})"
+        )
+    profile = EMBEDDING_PROFILES[name]
+    if profile["dtype"] not in ("float32", "float16", "int8"):
+        raise ValueError(f"Unsupported embedding dtype '{profile['dtype']}'")
+    return {"name": name, **profile}
+
+
+def normalize_embeddings(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (truncated embeddings are no longer unit length)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_embeddings(matrix: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize float32 embeddings to the given storage dtype.
+
+    int8 uses symmetric per-row scaling; float types use a scale of 1.
+
+    Args:
+        matrix: 2D float array of embeddings
+        dtype: "float32", "float16" or "int8"
+
+    Returns:
+        Tuple of (codes, per-row float32 scales)
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if dtype == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    scales = np.ones(matrix.shape[0], dtype=np.float32)
+    return matrix.astype(dtype), scales
+
+
+def dequantize_embeddings(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Convert quantized codes back to float32 embeddings"""
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def exact_top_k(query: np.ndarray, matrix: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine top-k of a query against a matrix of embeddings.
+
+    Args:
+        query: 1D query embedding
+        matrix: 2D matrix of candidate embeddings (one per row)
+        k: Number of results
+
+    Returns:
+        Tuple of (row indices, cosine scores), best first
+    """
+    if len(matrix) == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    scores = normalize_embeddings(matrix) @ normalize_embeddings(query)
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
@@ -0,0 +1,84 @@
+# backend/utils/etags.py
+"""
+Per-user content versions and ETag helpers for conditional requests in SabkiSoch API
+"""
+
+import hashlib
+import threading
+import uuid
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from constants import ETAG_CACHE_CONTROL
+
+
+class ContentVersions:
+    """
+    In-memory version counter per user, bumped whenever that user's stored data changes.
+
+    Writers bump after the change is committed and readers compute their ETag
+    before reading, so a response is never labelled with a newer version than
+    the data it contains. A random epoch is mixed in so ETags issued before a
+    restart never match afterwards.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.global_version = 0  # Bumped by collection-wide changes (clear all, full import)
+        self.versions: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def bump(self, user_id: Optional[str] = None) -> None:
+        """Mark one user's data (or everyone's, when user_id is None) as changed"""
+        with self.lock:
+            if user_id is None:
+                self.global_version += 1
+            else:
+                user_id = user_id.strip()
+                self.versions[user_id] = self.versions.get(user_id, 0) + 1
+
+    def etag(self, user_id: str, *variant) -> str:
+        """
+        Weak ETag for a user's data as rendered by one endpoint.
+
+        Args:
+            user_id: The user ID
+            variant: Request parameters that change the representation (layout, filters, ...)
+
+        Returns:
+            Weak ETag header value
+        """
+        user_id = (user_id or "").strip()
+        with self.lock:
+            version = f"{self.epoch}.{self.global_version}.{self.versions.get(user_id, 0)}"
+        key = "|".join([version, user_id, *(str(v) for v in variant)])
+        return f'W/"{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"'
+
+
+# Shared by every module that writes conversations
+CONTENT_VERSIONS = ContentVersions()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already has this ETag, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Attach the ETag and revalidation headers to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
+    return response
@@ -0,0 +1,102 @@
+# backend/utils/filters.py
+"""
+Time/source filter helpers that build ChromaDB where clauses for SabkiSoch API
+"""
+
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from fastapi import HTTPException
+
+from constants import MAX_SOURCE_LENGTH
+
+# Timestamps are stored as int64 metadata and compared against the hot tier's int64 array
+_TIMESTAMP_MIN = -(2 ** 63)
+_TIMESTAMP_MAX = 2 ** 63 - 1
+
+
+def timestamp_from_iso(value: Optional[str]) -> Optional[int]:
+    """Convert a stored ISO time string to epoch seconds (None if unparseable)"""
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_time_bound(value: Optional[str], name: str) -> Optional[int]:
+    """
+    Parse a since/until bound given as epoch seconds or an ISO 8601 string.
+
+    Raises:
+        HTTPException: If the value is neither
+    """
+    if value is None or not str(value).strip():
+        return None
+    value = str(value).strip()
+    try:
+        # inf/1e309 overflow and nan is rejected by int(); fall through to the 400 below
+        timestamp = int(float(value))
+    except (OverflowError, ValueError):
+        timestamp = timestamp_from_iso(value.replace("Z", "+00:00"))
+    if timestamp is None or not _TIMESTAMP_MIN <= timestamp <= _TIMESTAMP_MAX:
+        raise HTTPException(status_code=400, detail=f"{name} must be epoch seconds or an ISO 8601 datetime")
+    return timestamp
+
+
+def parse_filters(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    source: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Validate since/until/source query filters.
+
+    Args:
+        since: Lower time bound, inclusive (epoch seconds or ISO 8601)
+        until: Upper time bound, inclusive (epoch seconds or ISO 8601)
+        source: Source name (e.g. "chatgpt")
+
+    Returns:
+        Dictionary with "since"/"until" as epoch seconds and "source", each None when unset
+
+    Raises:
+        HTTPException: If a bound or the source is invalid
+    """
+    since_ts = parse_time_bound(since, "since")
+    until_ts = parse_time_bound(until, "until")
+    if since_ts is not None and until_ts is not None and since_ts > until_ts:
+        raise HTTPException(status_code=400, detail="since must not be after until")
+
+    if source is not None:
+        source = source.strip() or None
+    if source and len(source) > MAX_SOURCE_LENGTH:
+        raise HTTPException(status_code=400, detail=f"source too long (max {MAX_SOURCE_LENGTH} characters)")
+
+    return {"since": since_ts, "until": until_ts, "source": source}
+
+
+def build_where(user_id: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a ChromaDB where clause for a user's conversations, pushing the
+    time range and source filters down to Chroma.
+
+    Args:
+        user_id: The user ID
+        filters: Parsed filters from parse_filters
+
+    Returns:
+        Where clause dictionary
+    """
+    conditions = [{"user_id": user_id}]
+    filters = filters or {}
+
+    if filters.get("since") is not None:
+        conditions.append({"timestamp": {"$gte": filters["since"]}})
+    if filters.get("until") is not None:
+        conditions.append({"timestamp": {"$lte": filters["until"]}})
+    if filters.get("source"):
+        conditions.append({"source": filters["source"]})
+
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
@@ -3,7 +3,7 @@
 Text formatting utilities for SabkiSoch API
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 
 def format_conversations_for_prompt(documents: List[str], metadatas: List[Dict[str, Any]]) -> str:
@@ -25,6 +25,26 @@ def format_conversations_for_prompt(documents: List[str], metadatas: List[Dict[s
     return conversations_text
 
 
+def format_topics_for_prompt(groups: List[Tuple[int, List[str], List[Dict[str, Any]]]]) -> str:
+    """
+    Format representative conversations grouped by topic for the prompt.
+    
+    Args:
+        groups: List of (conversation count, documents, metadatas) per topic
+        
+    Returns:
+        Formatted string with each topic's representatives
+    """
+    conversations_text = "Previous conversations, grouped by topic (representative conversations only):\n"
+    for i, (count, documents, metadatas) in enumerate(groups):
+        conversations_text += f"\n=== Topic {i+1} ({count} conversation{'s' if count != 1 else ''}) ===\n"
+        for doc, metadata in zip(documents, metadatas):
+            source = metadata.get('source', 'unknown')
+            conversations_text += f"\n--- Conversation (from {source}) ---\n"
+            conversations_text += f"{doc}\n"
+    return conversations_text
+
+
 def format_single_conversation_for_prompt(document: str, metadata: Dict[str, Any]) -> str:
     """
     Format a single conversation for the prompt.
@@ -3,38 +3,71 @@
 Gemini AI helper functions and classes for SabkiSoch API
 """
 
+import numpy as np
 import google.generativeai as genai
 from constants import (
     GEMINI_MODEL_NAME,
     EMBEDDING_MODEL_NAME,
+    EMBEDDING_NATIVE_DIMENSIONS,
+    DEFAULT_EMBEDDING_PROFILE,
     TITLE_GENERATION_PROMPT,
-    MAX_TITLE_LENGTH
+    MAX_TITLE_LENGTH,
+    GEMINI_TIMEOUT_SECONDS,
+    GEMINI_SLOW_CALL_SECONDS
 )
+from utils.circuit_breaker import CircuitBreaker
+from utils.embeddings import get_embedding_profile, normalize_embeddings
+
+
+# One breaker per Gemini operation, so an embedding outage doesn't stop title generation
+GEMINI_BREAKERS = {
+    name: CircuitBreaker(name, slow_call_seconds=slow_call_seconds)
+    for name, slow_call_seconds in GEMINI_SLOW_CALL_SECONDS.items()
+}
 
 
 class GeminiEmbeddingFunction:
     """Custom embedding function for Gemini text embeddings"""
     
-    def __init__(self, model_name=EMBEDDING_MODEL_NAME):
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, profile=DEFAULT_EMBEDDING_PROFILE):
         self.model_name = model_name
+        self.profile = get_embedding_profile(profile)
+    
+    @property
+    def dimensions(self) -> int:
+        return self.profile["dimensions"]
+    
+    def _embed(self, text, task_type):
+        """Embed a single text at the profile's dimensionality"""
+        result = GEMINI_BREAKERS["embed"].call(
+            genai.embed_content,
+            model=self.model_name,
+            content=text,
+            task_type=task_type,
+            output_dimensionality=self.dimensions,
+            request_options={"timeout": GEMINI_TIMEOUT_SECONDS}
+        )
+        embedding = np.asarray(result['embedding'], dtype=np.float32)
+        if self.dimensions != EMBEDDING_NATIVE_DIMENSIONS:
+            # Only the native size comes back unit-length
+            embedding = normalize_embeddings(embedding)
+        return embedding
     
     def __call__(self, input_texts):
-        """Generate embeddings for input texts"""
-        embeddings = []
-        for text in input_texts:
-            result = genai.embed_content(
-                model=self.model_name,
-                content=text,
-                task_type="retrieval_document"
-            )
-            embeddings.append(result['embedding'])
-        return embeddings
+        """Generate full-precision embeddings for input texts (Chroma stores float32)"""
+        return [self._embed(text, "retrieval_document").tolist() for text in input_texts]
+    
+    def embed_query(self, text):
+        """Generate a full-precision embedding for a search query"""
+        return self._embed(text, "retrieval_query").tolist()
 
 
 def generate_title_with_gemini(text: str, source: str) -> str:
     """
     Generate a title using Gemini with fallback.
     
+    Falls back immediately while the "title" circuit is open.
+    
     Args:
         text: The conversation text to generate title for
         source: The source of the conversation (for fallback)
@@ -45,7 +78,11 @@ def generate_title_with_gemini(text: str, source: str) -> str:
     try:
         model = genai.GenerativeModel(GEMINI_MODEL_NAME)
         title_prompt = TITLE_GENERATION_PROMPT.format(text=text[:500])
-        title_response = model.generate_content(title_prompt)
+        title_response = GEMINI_BREAKERS["title"].call(
+            model.generate_content,
+            title_prompt,
+            request_options={"timeout": GEMINI_TIMEOUT_SECONDS}
+        )
         title = title_response.text.strip()[:MAX_TITLE_LENGTH]
         return title
     except Exception as e:
@@ -53,26 +90,38 @@ def generate_title_with_gemini(text: str, source: str) -> str:
         return f"Conversation from {source}"
 
 
-def generate_context_with_gemini(prompt: str, max_length: int) -> tuple[str, bool]:
+def generate_context_with_gemini(prompt: str, max_length: int, operation: str = "generate") -> tuple[str, bool]:
     """
     Generate context using Gemini with fallback.
     
+    Fails fast while the operation's circuit is open.
+    
     Args:
         prompt: The prompt to send to Gemini
         max_length: Maximum length for the generated context
+        operation: Breaker to account the call against ("generate" or "compact")
         
     Returns:
         Tuple of (generated_context, success_flag)
     """
     try:
         model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        response = model.generate_content(prompt)
+        response = GEMINI_BREAKERS[operation].call(
+            model.generate_content,
+            prompt,
+            request_options={"timeout": GEMINI_TIMEOUT_SECONDS}
+        )
         generated_context = response.text.strip()
         return generated_context, True
     except Exception as e:
         return "", False
 
 
-def create_gemini_embedding_function():
-    """Create and return a GeminiEmbeddingFunction instance"""
-    return GeminiEmbeddingFunction()
+def create_gemini_embedding_function(profile=DEFAULT_EMBEDDING_PROFILE):
+    """Create and return a GeminiEmbeddingFunction instance for the given storage profile"""
+    return GeminiEmbeddingFunction(profile=profile)
+
+
+def get_breaker_states():
+    """Return a snapshot of every Gemini circuit breaker"""
+    return {name: breaker.snapshot() for name, breaker in GEMINI_BREAKERS.items()}
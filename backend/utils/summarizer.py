@@ -0,0 +1,199 @@
+# backend/utils/summarizer.py
+"""
+Local extractive summarization (TF-IDF + TextRank) for SabkiSoch API
+"""
+
+import re
+from collections import Counter
+from typing import List, Dict, Any
+
+import numpy as np
+
+from constants import (
+    SUMMARIZER_TEXTRANK_MAX_SENTENCES,
+    SUMMARIZER_DAMPING,
+    SUMMARIZER_ITERATIONS,
+    SUMMARIZER_MIN_SENTENCE_WORDS,
+    SUMMARIZER_MAX_VOCABULARY,
+    SUMMARIZER_MIN_SHARE
+)
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+# Unicode word characters, so Devanagari, Cyrillic or CJK text gets a vocabulary too
+_WORD_RE = re.compile(r"\w[\w'-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have how i if in is it its me my "
+    "not of on or so that the this to was we what when which will with you your".split()
+)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into non-empty sentences"""
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def score_sentences(sentences: List[str]) -> np.ndarray:
+    """
+    Score sentences by how central they are to the text.
+
+    Sentences are embedded as L2-normalized TF-IDF vectors over the
+    SUMMARIZER_MAX_VOCABULARY terms found in the most sentences (terms in a
+    single sentence add nothing to sentence similarity), which bounds the
+    matrix for long conversations. Up to SUMMARIZER_TEXTRANK_MAX_SENTENCES
+    sentences are ranked with TextRank over the cosine similarity graph;
+    beyond that, by similarity to the centroid.
+
+    Args:
+        sentences: List of sentences
+
+    Returns:
+        Array with one score per sentence (higher is more informative)
+    """
+    tokens = [[w for w in _WORD_RE.findall(s.lower()) if w not in _STOPWORDS] for s in sentences]
+    document_frequency = Counter(w for words in tokens for w in set(words))
+    vocab = {
+        w: i for i, (w, _) in enumerate(document_frequency.most_common(SUMMARIZER_MAX_VOCABULARY))
+    }
+    rows, cols = [], []
+    for i, words in enumerate(tokens):
+        for w in words:
+            if w in vocab:
+                rows.append(i)
+                cols.append(vocab[w])
+
+    n = len(sentences)
+    if not vocab:
+        return np.zeros(n, dtype=np.float32)
+
+    counts = np.bincount(
+        np.asarray(rows, dtype=np.int64) * len(vocab) + np.asarray(cols, dtype=np.int64),
+        minlength=n * len(vocab)
+    ).astype(np.float32).reshape(n, len(vocab))
+
+    tf = np.log1p(counts)
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    matrix = tf * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+
+    if n <= SUMMARIZER_TEXTRANK_MAX_SENTENCES:
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        out_weight[out_weight == 0] = 1.0
+        transition = (similarity / out_weight).T
+
+        scores = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(SUMMARIZER_ITERATIONS):
+            updated = (1 - SUMMARIZER_DAMPING) / n + SUMMARIZER_DAMPING * (transition @ scores)
+            if np.abs(updated - scores).sum() < 1e-6:
+                scores = updated
+                break
+            scores = updated
+    else:
+        scores = matrix @ matrix.mean(axis=0)
+
+    # Fragments ("Sure!", "Thanks.") rarely carry information
+    word_counts = np.array([len(words) for words in tokens])
+    scores = np.where(word_counts < SUMMARIZER_MIN_SENTENCE_WORDS, 0.0, scores)
+    return scores.astype(np.float32)
+
+
+def _leading_sentences(sentences: List[str], max_length: int) -> str:
+    """Fill the budget with sentences in document order, skipping verbatim repeats"""
+    unique = list(dict.fromkeys(sentences))
+    text = " ".join(unique)
+    if len(text) <= max_length:
+        return text
+    return text[:max_length].rsplit(" ", 1)[0]
+
+
+def summarize_extractive(text: str, max_length: int) -> str:
+    """
+    Select the most informative sentences of a text within a character budget.
+
+    Args:
+        text: Text to summarize
+        max_length: Maximum length of the summary in characters
+
+    Returns:
+        Selected sentences in their original order
+    """
+    if max_length <= 0:
+        return ""
+    if len(text) <= max_length:
+        return text
+
+    sentences = split_sentences(text)
+    if not sentences:
+        return ""
+
+    scores = score_sentences(sentences)
+    if not (scores > 0).any():
+        # Nothing to rank (only fragments); keep the opening of the text
+        return _leading_sentences(sentences, max_length)
+
+    selected = []
+    seen = set()
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        # Skip fragments and sentences repeated verbatim (common in scraped chats)
+        if scores[i] <= 0 or sentences[i] in seen:
+            continue
+        cost = len(sentences[i]) + (1 if selected else 0)
+        if used + cost <= max_length:
+            selected.append(i)
+            seen.add(sentences[i])
+            used += cost
+
+    if not selected:
+        # Even the best sentence is too long; cut it at a word boundary
+        best = sentences[int(np.argmax(scores))]
+        return best[:max_length].rsplit(" ", 1)[0]
+
+    return " ".join(sentences[i] for i in sorted(selected))
+
+
+def summarize_conversations(
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    max_length: int
+) -> str:
+    """
+    Extractively summarize several conversations within a shared character budget.
+
+    Each conversation gets an equal share of the budget, so recent ones are not
+    crowded out the way a plain prefix cut would. If the budget can't give every
+    conversation SUMMARIZER_MIN_SHARE characters, only the most recent are kept.
+
+    Args:
+        documents: List of conversation documents
+        metadatas: List of metadata dictionaries
+        max_length: Maximum total length in characters
+
+    Returns:
+        Formatted string with one extractive summary per conversation
+    """
+    if not documents:
+        return ""
+
+    # With too many conversations for a useful share each, keep the most recent ones
+    keep = max(1, max_length // SUMMARIZER_MIN_SHARE)
+    if keep < len(documents):
+        recent = sorted(range(len(documents)), key=lambda i: metadatas[i].get("time") or "", reverse=True)[:keep]
+        recent.sort()
+        documents = [documents[i] for i in recent]
+        metadatas = [metadatas[i] for i in recent]
+
+    headers = [f"--- Conversation {i+1} (from {md.get('source', 'unknown')}) ---" for i, md in enumerate(metadatas)]
+    overhead = sum(len(h) + 2 for h in headers)
+    budget = max((max_length - overhead) // len(documents), 0)
+
+    parts = []
+    for header, doc in zip(headers, documents):
+        summary = summarize_extractive(doc, budget)
+        if summary:
+            parts.append(f"{header}\n{summary}")
+    return "\n".join(parts)[:max_length]
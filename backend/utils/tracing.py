@@ -0,0 +1,170 @@
+# backend/utils/tracing.py
+"""
+Per-request span timing and slow-request trace log for SabkiSoch API
+"""
+
+import contextvars
+import functools
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+
+from constants import SLOW_TRACE_LOG_SIZE
+
+# Spans of the request being traced; None when tracing is off, which makes span() a no-op
+_current_spans: contextvars.ContextVar[Optional[List[tuple]]] = contextvars.ContextVar("spans", default=None)
+
+# [start, recorded] of the current request's parsing/validation phase (see TracedRoute)
+_validation: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("validation", default=None)
+
+# Most recent slow-request traces, oldest first
+SLOW_REQUEST_TRACES: deque = deque(maxlen=SLOW_TRACE_LOG_SIZE)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time a block of work (Chroma call, Gemini call, ...) for the current request's trace.
+
+    Does nothing unless SlowRequestMiddleware is tracing the request.
+    """
+    spans = _current_spans.get()
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, time.perf_counter() - start))
+
+
+class TracedCollection:
+    """Proxy around a Chroma collection that records each call as a span"""
+
+    TRACED_METHODS = ("add", "get", "query", "update", "upsert", "delete", "count")
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._collection, name)
+        if name not in self.TRACED_METHODS:
+            return attr
+
+        def traced(*args, **kwargs):
+            with span(f"chroma.{name}"):
+                return attr(*args, **kwargs)
+        return traced
+
+
+def summarize_spans(spans: List[tuple], total: float) -> Dict[str, Any]:
+    """Aggregate spans by name into call counts and milliseconds"""
+    by_name: Dict[str, Dict[str, Any]] = {}
+    for name, duration in spans:
+        entry = by_name.setdefault(name, {"calls": 0, "ms": 0.0})
+        entry["calls"] += 1
+        entry["ms"] += duration * 1000
+    for entry in by_name.values():
+        entry["ms"] = round(entry["ms"], 2)
+    accounted = sum(duration for _, duration in spans)
+    # Remainder: business logic, serialization, waiting for a thread
+    by_name["other"] = {"calls": 1, "ms": round(max(total - accounted, 0.0) * 1000, 2)}
+    return by_name
+
+
+def _end_validation():
+    """Record the validation span once, when the endpoint is entered or the request fails"""
+    spans = _current_spans.get()
+    phase = _validation.get()
+    if spans is None or phase is None or phase[1]:
+        return
+    phase[1] = True
+    spans.append(("validation", time.perf_counter() - phase[0]))
+
+
+class TracedRoute(APIRoute):
+    """
+    Route that records body parsing, validation and dependency resolution as a span.
+
+    FastAPI does all of these before calling the endpoint, so the span runs
+    from the route handler starting until the endpoint is entered (or until
+    the request is rejected, e.g. with a 422). Set as the router's
+    route_class only when SlowRequestMiddleware is installed.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        @functools.wraps(endpoint)
+        async def traced_endpoint(*args, **kwargs):
+            _end_validation()
+            return await endpoint(*args, **kwargs)
+        super().__init__(path, traced_endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            token = _validation.set([time.perf_counter(), False])
+            try:
+                return await handler(request)
+            finally:
+                _end_validation()
+                _validation.reset(token)
+        return traced_handler
+
+
+class SlowRequestMiddleware:
+    """
+    ASGI middleware that times every request and keeps a trace of the slow ones.
+
+    Requests slower than threshold_ms are printed and kept in
+    SLOW_REQUEST_TRACES with their per-span breakdown. Only added to the app
+    when a threshold is configured, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app, threshold_ms: float):
+        self.app = app
+        self.threshold = threshold_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: List[tuple] = []
+        token = _current_spans.set(spans)
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            total = time.perf_counter() - start
+            _current_spans.reset(token)
+            if total >= self.threshold:
+                trace = {
+                    "time": datetime.now().isoformat(),
+                    "method": scope.get("method"),
+                    "path": scope.get("path"),
+                    "status": status,
+                    "duration_ms": round(total * 1000, 2),
+                    "spans": summarize_spans(spans, total)
+                }
+                SLOW_REQUEST_TRACES.append(trace)
+                breakdown = ", ".join(f"{name}={entry['ms']}ms" for name, entry in trace["spans"].items())
+                print(f"🐢 Slow request {trace['method']} {trace['path']} {trace['duration_ms']}ms ({breakdown})")
+
+
+def recent_slow_requests(limit: int) -> List[Dict[str, Any]]:
+    """Most recent slow-request traces, newest first"""
+    return list(reversed(SLOW_REQUEST_TRACES))[:limit]
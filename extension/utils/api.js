@@ -1,5 +1,53 @@
 // API utilities for backend communication
 
+const API_CACHE_PREFIX = 'ai_mem_api_cache:';
+
+/**
+ * Fetch JSON with ETag revalidation against a copy kept in chrome.storage.local.
+ * A 304 from the backend is answered from the cached body, so repeat views
+ * cost neither server work nor bandwidth.
+ * @param {string} url - Request URL
+ * @param {Object} options - fetch options
+ * @param {string} cacheKey - Key identifying this request (URL plus body for POSTs)
+ * @returns {Promise<Object>} Parsed JSON body
+ */
+async function fetchJsonWithCache(url, options, cacheKey) {
+    const storageKey = API_CACHE_PREFIX + cacheKey;
+    let cached = null;
+    try {
+        cached = (await chrome.storage.local.get([storageKey]))[storageKey] || null;
+    } catch (e) {
+        cached = null;
+    }
+
+    const headers = { ...(options.headers || {}) };
+    if (cached && cached.etag) {
+        headers['If-None-Match'] = cached.etag;
+    }
+
+    const response = await fetch(url, { ...options, headers });
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    try {
+        if (etag) {
+            await chrome.storage.local.set({ [storageKey]: { etag, data } });
+        } else if (cached) {
+            await chrome.storage.local.remove(storageKey);
+        }
+    } catch (e) {
+        // Quota exceeded or storage unavailable; the response is still usable
+        console.warn('⚠️ Could not cache API response:', e);
+    }
+    return data;
+}
+
 async function storeToBackend(payload, backendUrl) {
     try {
         const res = await fetch(`${backendUrl}/store`, {
@@ -25,20 +73,25 @@ async function storeToBackend(payload, backendUrl) {
 
 async function getAllContexts(userId, backendUrl) {
     try {
-        const response = await fetch(`${backendUrl}/get_all?user_id=${encodeURIComponent(userId)}`, {
+        const url = `${backendUrl}/get_all?user_id=${encodeURIComponent(userId)}&layout=columns`;
+        const data = await fetchJsonWithCache(url, {
             method: 'GET',
             headers: { 'Content-Type': 'application/json' },
             credentials: 'omit',
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
-
-        const data = await response.json();
+        }, url);
+
+        // Columnar layout keeps the payload small; rebuild items here
+        const ids = data.ids || [];
+        const documents = data.documents || [];
+        const metadatas = data.metadatas || [];
+        const items = ids.map((id, i) => ({
+            id: id,
+            text: documents[i],
+            metadata: metadatas[i]
+        }));
         return {
             success: true,
-            items: data.items || []
+            items: items
         };
     } catch (error) {
         console.error('❌ Error getting all contexts:', error);
@@ -51,23 +104,19 @@ async function getAllContexts(userId, backendUrl) {
 
 async function generateContext(userId, maxLength = 2000, backendUrl) {
     try {
-        const response = await fetch(`${backendUrl}/generate_context`, {
+        const url = `${backendUrl}/generate_context`;
+        const body = JSON.stringify({
+            user_id: userId,
+            max_length: maxLength
+        });
+        const data = await fetchJsonWithCache(url, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({
-                user_id: userId,
-                max_length: maxLength
-            }),
+            body: body,
             credentials: 'omit',
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
-
-        const data = await response.json();
+        }, `${url} ${body}`);
         return {
             success: true,
             context: data.context,
@@ -86,19 +135,14 @@ async function generateContext(userId, maxLength = 2000, backendUrl) {
 
 async function generateContextById(contextId, userId, maxLength = 2000, backendUrl) {
     try {
-        const response = await fetch(`${backendUrl}/generate_context/${contextId}?user_id=${encodeURIComponent(userId)}&max_length=${maxLength}`, {
+        const url = `${backendUrl}/generate_context/${contextId}?user_id=${encodeURIComponent(userId)}&max_length=${maxLength}`;
+        const data = await fetchJsonWithCache(url, {
             method: 'GET',
             headers: {
                 'Content-Type': 'application/json',
             },
             credentials: 'omit',
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
-
-        const data = await response.json();
+        }, url);
         return {
             success: true,
             context: data.context,